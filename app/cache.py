@@ -0,0 +1,159 @@
+# app/cache.py
+"""
+In-process caches invalidated by data version.
+
+sql/cache_versions.sql keeps one counter per watched table, bumped once per
+writing transaction, at its commit. A page reads the counter (one PK lookup) and reuses its
+cached result as long as the counter did not move, so every gunicorn worker
+stays coherent without a shared cache. When the version table is not
+installed the entries simply expire after their TTL.
+
+The same bump sends NOTIFY cache_version; on_change() subscribes to it
+through one LISTEN connection per worker (started on first subscription).
+"""
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from prometheus_client import Counter
+from psycopg2 import errors as pg_errors
+
+from app.metrics import timed_execute
+
+logger = logging.getLogger("app.cache")
+
+CACHE_REQUESTS = Counter("app_cache_requests_total", "In-process cache lookups", ["cache", "result"])  # hit | miss
+CACHE_EVICTIONS = Counter("app_cache_evictions_total", "Entries evicted by the LRU bound", ["cache"])
+
+_versions_installed = True
+
+
+def data_version(conn, name: str) -> Optional[int]:
+    """
+    Current version of `name` (None = unknown, fall back to TTL).
+    Run it first on a fresh connection: a missing table aborts the transaction.
+    """
+    global _versions_installed
+    if not _versions_installed:
+        return None
+    try:
+        with conn.cursor() as cur:
+            timed_execute(cur, "cache.version", "SELECT version FROM supchain.t_cache_version WHERE name = %s", (name,))
+            row = cur.fetchone()
+    except pg_errors.UndefinedTable:
+        conn.rollback()
+        _versions_installed = False
+        return None
+    return row[0] if row else 0
+
+
+class VersionedCache:
+    """
+    key -> value computed for one data version.
+    An entry is reused while its version matches (and, without a version, for
+    `ttl` seconds). Loaders run outside the lock; concurrent misses may both
+    compute, the last one wins. With `maxsize`, the least recently used
+    entries are evicted first.
+    """
+
+    def __init__(self, name: str, ttl: float = 60.0, maxsize: Optional[int] = None):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def peek(self, key: Hashable) -> Optional[Tuple[Any, Any]]:
+        """(version, value) of `key` without counting a lookup, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        return entry[0], entry[2]
+
+    def put(self, key: Hashable, version: Any, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while self.maxsize is not None and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.labels(self.name).inc()
+
+    def record(self, hit: bool) -> None:
+        """Count a lookup done with peek()/put()."""
+        CACHE_REQUESTS.labels(self.name, "hit" if hit else "miss").inc()
+
+    def get(self, key: Hashable, version: Optional[int], loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            cached_version, stored_at, value = entry
+            fresh = (cached_version == version) if version is not None else (now - stored_at < self.ttl)
+            if fresh:
+                self.record(True)
+                return value
+        self.record(False)
+        value = loader()
+        self.put(key, version, value)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# ---------- NOTIFY cache_version ----------
+_subscribers: Dict[str, List[Callable[[], None]]] = {}
+_listener: Optional[threading.Thread] = None
+_listener_lock = threading.Lock()
+
+
+def _listen() -> None:
+    # LISTEN is not allowed on a hot standby: always the primary
+    from app.db.database import get_connection
+
+    while True:
+        conn = None
+        try:
+            conn = get_connection()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("LISTEN cache_version")
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    name = conn.notifies.pop(0).payload
+                    for callback in _subscribers.get(name, []):
+                        try:
+                            callback()
+                        except Exception:
+                            logger.exception("cache_version callback for %s failed", name)
+        except Exception as e:
+            logger.warning("cache_version listener down, retrying in 5s: %s", e)
+            time.sleep(5)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def on_change(name: str, callback: Callable[[], None]) -> None:
+    """Call `callback` (in the listener thread) whenever data version `name` is bumped."""
+    global _listener
+    with _listener_lock:
+        _subscribers.setdefault(name, []).append(callback)
+        # started lazily: a thread created before gunicorn forks would not survive
+        if _listener is None:
+            _listener = threading.Thread(target=_listen, name="cache-version-listener", daemon=True)
+            _listener.start()
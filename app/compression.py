@@ -0,0 +1,142 @@
+# app/compression.py
+"""
+Negotiated response compression (brotli when the client and the server both
+support it, gzip otherwise).
+
+- responses smaller than COMPRESSION_MIN_SIZE bytes are sent as-is
+- only text-like content types are compressed (HTML, JSON, CSV, JS, CSS…)
+- streaming responses (exports) are compressed chunk by chunk, never buffered
+- a route can opt out with the @no_compression decorator
+"""
+import os
+import zlib
+from typing import Callable, Optional
+
+try:  # optional: gzip only when the wheel is not installed
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# brotli 4-5 is close to gzip -6 in CPU with noticeably smaller output
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def no_compression(endpoint: Callable) -> Callable:
+    """Mark a route endpoint as never compressed (put it under @router.get)."""
+    endpoint.no_compression = True
+    return endpoint
+
+
+def _pick_encoding(accept: str) -> Optional[str]:
+    accepted = {p.split(";")[0].strip().lower() for p in accept.split(",") if p.strip()
+                and not p.replace(" ", "").endswith(";q=0")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Encoder:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def chunk(self, data: bytes) -> bytes:
+        # flush so each streamed chunk reaches the client immediately
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.flush()
+        return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.finish()
+        return self._c.compress(data) + self._c.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware; decides per response once headers and first body chunk are known."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for k, v in scope.get("headers", []):
+            if k == b"accept-encoding":
+                accept = v.decode("latin-1")
+                break
+        encoding = _pick_encoding(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, encoder, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                ctype = headers.get(b"content-type", b"").decode("latin-1")
+                route = scope.get("route")
+                passthrough = (
+                    b"content-encoding" in headers
+                    or not ctype.startswith(COMPRESSIBLE_TYPES)
+                    or getattr(getattr(route, "endpoint", None), "no_compression", False)
+                )
+                if passthrough:
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+
+            if encoder is None:
+                if not more and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                encoder = _Encoder(encoding)
+                headers = [(k, v) for k, v in start_message.get("headers", [])
+                           if k.lower() not in (b"content-length", b"content-encoding")]
+                headers.append((b"content-encoding", encoding.encode()))
+                headers.append((b"vary", b"Accept-Encoding"))
+                if not more:
+                    payload = encoder.finish(body)
+                    headers.append((b"content-length", str(len(payload)).encode()))
+                    await send({**start_message, "headers": headers})
+                    await send({"type": "http.response.body", "body": payload, "more_body": False})
+                    return
+                await send({**start_message, "headers": headers})
+
+            payload = encoder.chunk(body) if more else encoder.finish(body)
+            await send({"type": "http.response.body", "body": payload, "more_body": more})
+
+        await self.app(scope, receive, send_wrapper)
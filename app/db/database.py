@@ -0,0 +1,64 @@
+# app/db/database.py
+import os
+
+import psycopg2
+from dotenv import load_dotenv
+
+from app import deadlines
+from app.db.slow_queries import SlowQueryCursor
+
+load_dotenv()
+
+# DB_* for local runs, MyEnv* as injected by deploy.yaml
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", os.getenv("MyEnvHost", "localhost")),
+    "port": os.getenv("DB_PORT", os.getenv("MyEnvPort", "5432")),
+    "user": os.getenv("DB_USER", os.getenv("MyEnvUser", "postgres")),
+    "password": os.getenv("DB_PASSWORD", os.getenv("MyEnvPassword", "password")),
+    "dbname": os.getenv("DB_NAME", os.getenv("MyEnvName", "dell")),
+}
+
+# /readyz must answer within the probe timeout even when the DB hangs
+DB_PING_TIMEOUT_S = int(os.getenv("DB_PING_TIMEOUT_S", "2"))
+
+
+def get_connection():
+    """
+    New psycopg2 connection; every cursor goes through the slow-query log.
+    Inside a request it carries the route's statement_timeout and is cancelled
+    if the client disconnects (app/deadlines.py).
+    """
+    conn = psycopg2.connect(cursor_factory=SlowQueryCursor, **DB_CONFIG, **deadlines.connect_options())
+    deadlines.track(conn)
+    return conn
+
+
+def get_read_connection(request=None):
+    """
+    Connection for read-only pages: a healthy read replica when DB_READ_DSNS is
+    set, the primary otherwise (no replica configured, all lagging/down, or the
+    client just wrote something — see app/db/replicas.py).
+    """
+    from app.db import replicas
+
+    if not replicas.reads_from_primary(request):
+        conn = replicas.replica_connection()
+        if conn is not None:
+            return conn
+        if replicas.READ_DSNS:
+            # no usable replica: already counted once, as "fallback"
+            return get_connection()
+    replicas.DB_READ_ROUTE.labels("primary").inc()
+    return get_connection()
+
+
+def ping() -> None:
+    """SELECT 1 on the primary with short timeouts; raises psycopg2.Error when it is not usable."""
+    conn = psycopg2.connect(**DB_CONFIG, connect_timeout=DB_PING_TIMEOUT_S,
+                            options=f"-c statement_timeout={DB_PING_TIMEOUT_S * 1000}")
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+            cur.fetchone()
+    finally:
+        conn.close()
@@ -0,0 +1,175 @@
+# app/db/replicas.py
+"""
+Read-replica routing for the read-only list pages.
+
+DB_READ_DSNS is a comma-separated list of libpq DSNs / URLs
+(e.g. "host=replica1 dbname=dell user=ro,host=replica2 dbname=dell user=ro").
+When it is empty every read goes to the primary, exactly as before.
+
+- replicas are tried round-robin
+- a replica whose replay lag is above DB_REPLICA_MAX_LAG_S, or that cannot be
+  reached within DB_REPLICA_CONNECT_TIMEOUT, is skipped for DB_REPLICA_CHECK_S
+  seconds and the read falls back to the next replica, then to the primary
+- after a write the response sets a short-lived cookie (pin_primary); requests
+  carrying it read from the primary so users see their own changes
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import psycopg2
+from prometheus_client import Counter
+
+from app import deadlines
+from app.db.slow_queries import SlowQueryCursor
+
+logger = logging.getLogger("app.db.replicas")
+
+READ_DSNS: List[str] = [d.strip() for d in os.getenv("DB_READ_DSNS", "").split(",") if d.strip()]
+MAX_LAG_S = float(os.getenv("DB_REPLICA_MAX_LAG_S", "5"))
+CHECK_S = float(os.getenv("DB_REPLICA_CHECK_S", "5"))
+CONNECT_TIMEOUT = int(os.getenv("DB_REPLICA_CONNECT_TIMEOUT", "2"))
+
+# read-after-write: how long a client keeps reading from the primary
+READ_AFTER_WRITE_S = int(os.getenv("DB_READ_AFTER_WRITE_S", "10"))
+PRIMARY_COOKIE = "db_primary"
+
+DB_READ_ROUTE = Counter(
+    "db_read_connections_total",
+    "Connections opened for read-only pages, by target",
+    ["target"],  # replica | primary | fallback
+)
+
+# receiver silent for longer than this = replication broken (the primary sends
+# a keepalive every wal_sender_timeout / 2, 30s by default)
+RECEIVER_STALE_S = float(os.getenv("DB_REPLICA_RECEIVER_STALE_S", "60"))
+
+# 0 when a streaming replica has replayed everything it received (an idle
+# primary does not make a caught-up replica look lagging). When the WAL
+# receiver is gone, not streaming or silent, receive = replay LSN says nothing:
+# the lag is the age of the last replayed transaction (Infinity if none), so
+# the replica turns unhealthy once its data is older than DB_REPLICA_MAX_LAG_S.
+# Without pg_read_all_stats the receiver's status is hidden (NULL): only its
+# presence is checked.
+LAG_SQL = """
+    WITH r AS (SELECT status, last_msg_receipt_time FROM pg_stat_wal_receiver)
+    SELECT CASE
+             WHEN NOT pg_is_in_recovery() THEN 0
+             WHEN NOT EXISTS (SELECT 1 FROM r)
+                  OR EXISTS (SELECT 1 FROM r
+                             WHERE status IS NOT NULL
+                               AND (status <> 'streaming'
+                                    OR last_msg_receipt_time < now() - make_interval(secs => %s)))
+               THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8, 'Infinity')
+             WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8, 0)
+           END
+"""
+
+
+class _ReplicaState:
+    __slots__ = ("dsn", "checked_at", "healthy", "lag")
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.checked_at = 0.0
+        self.healthy = True
+        self.lag = 0.0
+
+
+_states: List[_ReplicaState] = [_ReplicaState(d) for d in READ_DSNS]
+_rr = itertools.count()
+_lock = threading.Lock()
+
+
+def _connect(state: _ReplicaState):
+    conn = psycopg2.connect(state.dsn, cursor_factory=SlowQueryCursor, connect_timeout=CONNECT_TIMEOUT,
+                            **deadlines.connect_options())
+    deadlines.track(conn)
+    return conn
+
+
+def _try_replica(state: _ReplicaState):
+    """Open a connection to `state`, re-checking its lag when the last check is stale."""
+    now = time.monotonic()
+    if not state.healthy and now - state.checked_at < CHECK_S:
+        return None
+    try:
+        conn = _connect(state)
+    except psycopg2.OperationalError as e:
+        logger.warning("read replica unreachable, falling back: %s", e)
+        state.healthy, state.checked_at = False, now
+        return None
+
+    if now - state.checked_at >= CHECK_S or not state.healthy:
+        try:
+            with conn.cursor() as cur:
+                cur.execute(LAG_SQL, (RECEIVER_STALE_S,))
+                state.lag = float(cur.fetchone()[0])
+            conn.rollback()
+        except psycopg2.Error as e:
+            logger.warning("read replica lag check failed: %s", e)
+            conn.close()
+            state.healthy, state.checked_at = False, now
+            return None
+        state.healthy, state.checked_at = state.lag <= MAX_LAG_S, now
+        if not state.healthy:
+            logger.warning("read replica lagging %.1fs (max %.1fs), falling back", state.lag, MAX_LAG_S)
+
+    if not state.healthy:
+        conn.close()
+        return None
+    return conn
+
+
+def replica_connection():
+    """Connection to a healthy replica, or None when the read must go to the primary."""
+    if not _states:
+        return None
+    with _lock:
+        start = next(_rr)
+    for i in range(len(_states)):
+        conn = _try_replica(_states[(start + i) % len(_states)])
+        if conn is not None:
+            DB_READ_ROUTE.labels("replica").inc()
+            return conn
+    DB_READ_ROUTE.labels("fallback").inc()
+    return None
+
+
+def warm() -> int:
+    """Connect to every replica once (DNS, TLS, auth, lag check); returns how many are healthy."""
+    healthy = 0
+    for state in _states:
+        conn = _try_replica(state)
+        if conn is not None:
+            conn.close()
+            healthy += 1
+    return healthy
+
+
+def replica_status() -> List[Dict[str, object]]:
+    """Last known state of every replica (host only, never the password)."""
+    out = []
+    for s in _states:
+        try:
+            host = psycopg2.extensions.parse_dsn(s.dsn).get("host", "?")
+        except psycopg2.ProgrammingError:
+            host = "?"
+        out.append({"host": host, "healthy": s.healthy, "lag_s": round(s.lag, 3),
+                    "checked_s_ago": round(time.monotonic() - s.checked_at, 1) if s.checked_at else None})
+    return out
+
+
+# ---------- read-after-write ----------
+def pin_primary(response) -> None:
+    """Call on the response of a write: the client reads from the primary for a few seconds."""
+    if _states:
+        response.set_cookie(PRIMARY_COOKIE, "1", max_age=READ_AFTER_WRITE_S, httponly=True, samesite="lax")
+
+
+def reads_from_primary(request: Optional[object]) -> bool:
+    return request is not None and PRIMARY_COOKIE in getattr(request, "cookies", {})
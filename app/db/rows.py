@@ -0,0 +1,43 @@
+# app/db/rows.py
+"""
+Compact rows for list pages.
+
+A dict per row costs a hash table per row (~1 KB for a 30-column row); a
+namedtuple costs one tuple, the field names living once on its class.
+record_type() builds that class once per query shape (the tuple of column
+names) and keeps it, so `select *` pages pick up new columns by themselves.
+
+Templates read records by attribute (`r.t_poolservers_id`), exactly as they
+read dicts. Column names that are not valid identifiers are renamed _0, _1…
+(namedtuple rename=True).
+"""
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+
+@lru_cache(maxsize=256)
+def record_type(columns: Tuple[str, ...]) -> type:
+    """The namedtuple class for one query shape (cached)."""
+    return namedtuple("Record", columns, rename=True)
+
+
+def records(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[Any]:
+    """Rows (tuples from fetchall) as records of their column names."""
+    make = record_type(tuple(columns))._make
+    return [make(r) for r in rows]
+
+
+def converted_records(columns: Sequence[str], rows: Iterable[Sequence[Any]],
+                      convert: Callable[[str], Optional[Callable[[Any], Any]]]) -> List[Any]:
+    """
+    records() with per-column value conversion: convert(column) returns a
+    function applied to that column's values, or None to keep them as is.
+    The converters are looked up once per query, not once per cell.
+    """
+    make = record_type(tuple(columns))._make
+    fns = [convert(c) for c in columns]
+    if not any(fns):
+        return [make(r) for r in rows]
+    pairs = list(enumerate(fns))
+    return [make([fn(r[i]) if fn is not None else r[i] for i, fn in pairs]) for r in rows]
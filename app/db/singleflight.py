@@ -0,0 +1,166 @@
+# app/db/singleflight.py
+"""
+Request coalescing for identical concurrent reads ("singleflight").
+
+When many clients open the same page at the same instant, they all run the
+same COUNT and page queries. shared_fetch() lets the first caller (the
+leader) run the query; callers arriving with the same (database, sql, params)
+while it is in flight wait for its result instead of running their own.
+
+- opt-in per query: only statements sent through shared_fetch() are coalesced
+- nothing is cached: once the leader finishes, the next caller runs the query
+- a failed execution is not shared: each waiting caller then runs the query
+  itself (the leader may have been cancelled because its client left)
+- a follower waits at most its own query budget (app/deadlines.py) and stops
+  waiting when its client leaves: QueryCanceled, i.e. the same 503 as a
+  statement_timeout
+- works from threadpool-run sync handlers (blocking wait) and from async
+  handlers (shared_fetch_async: awaits without blocking the event loop)
+
+SINGLEFLIGHT=0 disables coalescing (every call runs its own query).
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+from prometheus_client import Counter
+from psycopg2.errors import QueryCanceled
+
+from app.deadlines import client_disconnected, wait_budget_s
+from app.metrics import timed_execute
+
+SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT", "1") != "0"
+
+# leader = ran the query, follower = reused a leader's result
+DB_COALESCED = Counter("db_query_coalesced_total", "Reads sent through shared_fetch, by role",
+                       ["query", "role"])
+
+_inflight: Dict[Hashable, Future] = {}
+_lock = threading.Lock()
+
+# how often a waiting follower checks for its client's disconnect
+_POLL_S = 0.5
+
+
+def _key(cur, sql: str, params: Optional[Sequence[Any]], fetch: str) -> Hashable:
+    # the dsn keeps primary and replica reads apart (a pinned client must not get replica rows)
+    return cur.connection.dsn, sql, tuple(params or ()), fetch
+
+
+def _run(cur, name: str, sql: str, params: Optional[Sequence[Any]], fetch: str) -> Any:
+    timed_execute(cur, name, sql, params)
+    if fetch == "one":
+        return cur.fetchone()
+    rows = cur.fetchall()
+    if fetch == "columns":  # a follower's own cursor has no description
+        return [c.name for c in cur.description], rows
+    return rows
+
+
+def _copy(result: Any, fetch: str) -> Any:
+    # every caller gets its own list: rows (tuples) are shared, the container is not
+    if fetch == "one":
+        return result
+    if fetch == "columns":
+        return list(result[0]), list(result[1])
+    return list(result)
+
+
+def _join(key: Hashable) -> Tuple[Future, bool]:
+    """(future of the in-flight execution, True if the caller must run it)."""
+    with _lock:
+        fut = _inflight.get(key)
+        if fut is not None:
+            return fut, False
+        fut = Future()
+        fut.set_running_or_notify_cancel()  # a cancelled async follower must not cancel it for the others
+        _inflight[key] = fut
+        return fut, True
+
+
+def _finish(key: Hashable, fut: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+    with _lock:
+        _inflight.pop(key, None)
+    if error is not None:
+        # followers run the query themselves on any error, including the leader being cancelled
+        fut.set_exception(error if isinstance(error, Exception) else RuntimeError("leader aborted"))
+    else:
+        fut.set_result(result)
+
+
+def _wait(fut: Future) -> None:
+    """Block until the leader is done; QueryCanceled past the caller's budget or on disconnect."""
+    budget = wait_budget_s()
+    end = None if budget is None else time.monotonic() + budget
+    while True:
+        if client_disconnected():
+            raise QueryCanceled("client disconnected while waiting for a coalesced query")
+        timeout = _POLL_S if end is None else min(_POLL_S, end - time.monotonic())
+        if timeout <= 0:
+            raise QueryCanceled(f"canceling statement due to statement timeout ({budget:g}s waiting for a coalesced query)")
+        if wait([fut], timeout=timeout).done:
+            return
+
+
+def shared_fetch(cur, name: str, sql: str, params: Optional[Sequence[Any]] = None, fetch: str = "all") -> Any:
+    """
+    timed_execute() + fetchall() (fetch="all"), fetchone() (fetch="one") or
+    (column names, fetchall()) (fetch="columns"), sharing the execution with
+    identical concurrent calls.
+    """
+    if not SINGLEFLIGHT_ENABLED:
+        return _run(cur, name, sql, params, fetch)
+    key = _key(cur, sql, params, fetch)
+    fut, leader = _join(key)
+    if not leader:
+        _wait(fut)
+        try:
+            result = fut.result()
+        except Exception:
+            return _run(cur, name, sql, params, fetch)
+        DB_COALESCED.labels(name, "follower").inc()
+        return _copy(result, fetch)
+    DB_COALESCED.labels(name, "leader").inc()
+    try:
+        result = _run(cur, name, sql, params, fetch)
+    except BaseException as e:
+        _finish(key, fut, error=e)
+        raise
+    _finish(key, fut, result)
+    return _copy(result, fetch)
+
+
+async def shared_fetch_async(cur, name: str, sql: str, params: Optional[Sequence[Any]] = None,
+                             fetch: str = "all") -> Any:
+    """
+    shared_fetch() for async handlers: the query runs in the threadpool and a
+    follower awaits the leader (whichever thread it runs in) without blocking
+    the event loop.
+    """
+    from anyio import to_thread
+
+    if not SINGLEFLIGHT_ENABLED:
+        return await to_thread.run_sync(_run, cur, name, sql, params, fetch)
+    key = _key(cur, sql, params, fetch)
+    fut, leader = _join(key)
+    if not leader:
+        budget = wait_budget_s()
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(fut), budget)
+        except asyncio.TimeoutError:
+            raise QueryCanceled(f"canceling statement due to statement timeout ({budget:g}s waiting for a coalesced query)")
+        except Exception:
+            return await to_thread.run_sync(_run, cur, name, sql, params, fetch)
+        DB_COALESCED.labels(name, "follower").inc()
+        return _copy(result, fetch)
+    DB_COALESCED.labels(name, "leader").inc()
+    try:
+        result = await to_thread.run_sync(_run, cur, name, sql, params, fetch)
+    except BaseException as e:
+        _finish(key, fut, error=e)
+        raise
+    _finish(key, fut, result)
+    return _copy(result, fetch)
@@ -0,0 +1,142 @@
+# app/db/slow_queries.py
+"""
+Slow-query log for every cursor handed out by app.db.database.get_connection().
+
+Statements slower than SLOW_QUERY_MS are logged (logger "app.slow_queries")
+with their bound parameters, and a sample of the slow read-only SELECTs is
+re-run under EXPLAIN (ANALYZE, BUFFERS) so the plan that made them slow is
+captured too. The EXPLAIN always runs in a savepoint (or transaction) that is
+rolled back.
+
+Env:
+  SLOW_QUERY_MS              threshold in ms (default 500, 0 disables)
+  SLOW_QUERY_REDACT          1 = log parameters as '?' (default 1; 0 shows values,
+                             also on the unauthenticated /admin/slow_queries)
+  SLOW_QUERY_EXPLAIN_SAMPLE  fraction of slow SELECTs to EXPLAIN (default 0 = never)
+  SLOW_QUERY_LOG_FILE        rotating log file (default: none, stderr only)
+  SLOW_QUERY_KEEP            entries kept in memory for /admin/slow_queries (default 200)
+"""
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any, Deque, Dict, List
+
+from psycopg2.extensions import cursor as _BaseCursor
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_REDACT = os.getenv("SLOW_QUERY_REDACT", "1") == "1"
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0"))
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE")
+SLOW_QUERY_KEEP = int(os.getenv("SLOW_QUERY_KEEP", "200"))
+
+logger = logging.getLogger("app.slow_queries")
+if SLOW_QUERY_LOG_FILE:
+    _handler = RotatingFileHandler(SLOW_QUERY_LOG_FILE, maxBytes=10 * 1024 * 1024, backupCount=5)
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+_recent: Deque[Dict[str, Any]] = deque(maxlen=SLOW_QUERY_KEEP)
+_recent_lock = threading.Lock()
+
+
+def _redact(params: Any) -> Any:
+    """Parameters as display strings (JSON-safe), or '?' when redaction is on."""
+    if params is None:
+        return None
+    show = (lambda v: "?") if SLOW_QUERY_REDACT else repr
+    if isinstance(params, dict):
+        return {k: show(v) for k, v in params.items()}
+    return [show(v) for v in params]
+
+
+# anywhere in the statement: data-modifying CTEs, SELECT INTO, row locks,
+# sequence / advisory lock side effects
+_WRITE_RE = re.compile(
+    r"\b(insert|update|delete|merge|into|share|nextval|setval|pg_advisory\w*)\b",
+    re.IGNORECASE,
+)
+
+
+def _is_select(sql: Any) -> bool:
+    # only re-run statements shown to be read-only (a false "no" just skips the plan)
+    text = sql.decode() if isinstance(sql, bytes) else str(sql)
+    head = text.lstrip().lower()
+    return (head.startswith("select") or head.startswith("with")) and not _WRITE_RE.search(text)
+
+
+def recent_slow_queries() -> List[Dict[str, Any]]:
+    """Most recent slow statements, newest first."""
+    with _recent_lock:
+        return list(reversed(_recent))
+
+
+class SlowQueryCursor(_BaseCursor):
+    """psycopg2 cursor timing execute(); used as the connection cursor_factory."""
+
+    def execute(self, query, vars=None):
+        if SLOW_QUERY_MS <= 0:
+            return super().execute(query, vars)
+
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if elapsed_ms >= SLOW_QUERY_MS:
+                self._record(query, vars, elapsed_ms)
+
+    def _record(self, query, vars, elapsed_ms: float) -> None:
+        entry: Dict[str, Any] = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "duration_ms": round(elapsed_ms, 1),
+            "rows": self.rowcount,
+            "sql": " ".join(str(query).split()),
+            "params": _redact(vars),
+            "plan": None,
+        }
+        if (
+            SLOW_QUERY_EXPLAIN_SAMPLE > 0
+            and random.random() < SLOW_QUERY_EXPLAIN_SAMPLE
+            and _is_select(query)
+            and not self.connection.closed
+        ):
+            entry["plan"] = self._explain(query, vars)
+
+        logger.warning(
+            "slow query %.1f ms rows=%s sql=%s params=%s%s",
+            elapsed_ms, entry["rows"], entry["sql"], entry["params"],
+            ("\n" + entry["plan"]) if entry["plan"] else "",
+        )
+        with _recent_lock:
+            _recent.append(entry)
+
+    def _explain(self, query, vars) -> str | None:
+        # plain cursor: the EXPLAIN itself must not be timed/recorded again.
+        # ANALYZE really executes the statement: whatever it did is rolled
+        # back (savepoint inside the caller's transaction, else a transaction
+        # of its own), which also keeps a failing EXPLAIN from aborting the
+        # caller's remaining queries.
+        in_tx = not self.connection.autocommit
+        begin, end = (("SAVEPOINT slow_query_explain", "ROLLBACK TO SAVEPOINT slow_query_explain")
+                      if in_tx else ("BEGIN", "ROLLBACK"))
+        with _BaseCursor(self.connection) as cur:
+            try:
+                cur.execute(begin)
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + str(query), vars)
+                return "\n".join(r[0] for r in cur.fetchall())
+            except Exception as e:  # statement timeout, permissions…
+                return f"EXPLAIN failed: {e}"
+            finally:
+                try:
+                    cur.execute(end)
+                    if in_tx:
+                        cur.execute("RELEASE SAVEPOINT slow_query_explain")
+                except Exception:
+                    pass
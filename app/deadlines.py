@@ -0,0 +1,189 @@
+# app/deadlines.py
+"""
+Per-route query deadlines and cancellation on client disconnect.
+
+- every connection opened while serving a request gets
+  `statement_timeout` = the route budget (QUERY_TIMEOUT_MS by default,
+  @query_budget(ms) on the endpoint, QUERY_BUDGETS_MS env to override:
+  "/pool_servers=3000,/assets=5000"); long writes and refreshes opt out
+  with @query_budget(0)
+- when the client goes away, the Postgres query still running for it is
+  cancelled (connection.cancel(), same as pg_cancel_backend) instead of
+  holding a threadpool thread and a backend until it completes
+- a query over budget raises QueryCanceled -> 503 with Retry-After (the HTML
+  page for page routes, JSON for API routes and JSON clients)
+
+CSV exports stream from their own producer thread and are not covered by
+the budget (they already stop COPY on disconnect, see services/export.py).
+"""
+import asyncio
+import contextvars
+import logging
+import os
+from typing import Callable, Dict, Optional, Set
+
+from prometheus_client import Counter
+from starlette.responses import HTMLResponse
+from starlette.templating import Jinja2Templates
+
+from app.serialization import JSONResponse
+
+logger = logging.getLogger("app.deadlines")
+
+QUERY_TIMEOUT_MS = int(os.getenv("QUERY_TIMEOUT_MS", "10000"))
+RETRY_AFTER_S = int(os.getenv("QUERY_RETRY_AFTER_S", "30"))
+
+
+def _parse_budgets(raw: str) -> Dict[str, int]:
+    out = {}
+    for item in raw.split(","):
+        path, _, ms = item.partition("=")
+        if path.strip() and ms.strip().isdigit():
+            out[path.strip()] = int(ms)
+    return out
+
+
+BUDGET_OVERRIDES = _parse_budgets(os.getenv("QUERY_BUDGETS_MS", ""))
+
+DB_QUERIES_CANCELLED = Counter(
+    "db_queries_cancelled_total",
+    "Queries stopped before completion",
+    ["reason"],  # timeout | disconnect
+)
+
+templates = Jinja2Templates(directory="app/templates")
+
+
+class _RequestDeadline:
+    __slots__ = ("scope", "connections", "disconnected")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.connections: Set = set()
+        self.disconnected = False
+
+    def budget_ms(self) -> int:
+        route = self.scope.get("route")
+        path = getattr(route, "path", None)
+        if path in BUDGET_OVERRIDES:
+            return BUDGET_OVERRIDES[path]
+        return getattr(getattr(route, "endpoint", None), "query_budget_ms", QUERY_TIMEOUT_MS)
+
+
+# set by the middleware; copied into the threadpool thread running sync handlers
+_current: contextvars.ContextVar[Optional[_RequestDeadline]] = contextvars.ContextVar("query_deadline", default=None)
+
+
+def query_budget(ms: int) -> Callable:
+    """statement_timeout for every query of this endpoint (0 = no limit); put it under @router.get."""
+    def deco(endpoint: Callable) -> Callable:
+        endpoint.query_budget_ms = ms
+        return endpoint
+    return deco
+
+
+def connect_options() -> Dict[str, str]:
+    """Extra psycopg2.connect() kwargs for a connection opened by the current request."""
+    deadline = _current.get()
+    if deadline is None:
+        return {}
+    # set at connect time: no extra round trip
+    return {"options": f"-c statement_timeout={deadline.budget_ms()}"}
+
+
+def wait_budget_s() -> Optional[float]:
+    """Budget of the current request in seconds, for waits that no statement_timeout covers (None = no limit)."""
+    deadline = _current.get()
+    if deadline is None or deadline.budget_ms() <= 0:
+        return None
+    return deadline.budget_ms() / 1000
+
+
+def client_disconnected() -> bool:
+    deadline = _current.get()
+    return deadline is not None and deadline.disconnected
+
+
+def track(conn) -> None:
+    """Register `conn` so it can be cancelled if the client disconnects."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.connections.add(conn)
+
+
+def _cancel_all(deadline: _RequestDeadline) -> None:
+    for conn in list(deadline.connections):
+        if conn.closed:
+            continue
+        try:
+            conn.cancel()  # thread-safe, no-op when idle
+            DB_QUERIES_CANCELLED.labels("disconnect").inc()
+        except Exception as e:  # connection closed between the check and the call
+            logger.debug("cancel failed: %s", e)
+
+
+class QueryDeadlineMiddleware:
+    """
+    Pure ASGI middleware. receive() is read by a watcher task and relayed to
+    the app through a queue, so the disconnect is noticed while a sync
+    handler is still blocked in Postgres.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        deadline = _RequestDeadline(scope)
+        inbox: asyncio.Queue = asyncio.Queue()
+
+        async def watch():
+            while True:
+                message = await receive()
+                await inbox.put(message)
+                if message["type"] == "http.disconnect":
+                    deadline.disconnected = True
+                    _cancel_all(deadline)
+                    return
+
+        watcher = asyncio.ensure_future(watch())
+        token = _current.set(deadline)
+        try:
+            await self.app(scope, inbox.get, send)
+        finally:
+            _current.reset(token)
+            watcher.cancel()
+
+
+def _wants_html(request) -> bool:
+    """HTML page routes get the 503 page; API routes and JSON clients get JSON."""
+    accept = request.headers.get("accept", "")
+    if "application/json" in accept and "text/html" not in accept:
+        return False
+    response_class = getattr(request.scope.get("route"), "response_class", None)
+    return isinstance(response_class, type) and issubclass(response_class, HTMLResponse)
+
+
+async def query_timeout_handler(request, exc):
+    """QueryCanceled raised by statement_timeout -> 503 with retry guidance."""
+    deadline = _current.get()
+    budget = deadline.budget_ms() if deadline is not None else QUERY_TIMEOUT_MS
+    if deadline is None or not deadline.disconnected:
+        DB_QUERIES_CANCELLED.labels("timeout").inc()
+    # after a disconnect the response below is simply dropped by the server
+    if not _wants_html(request):
+        return JSONResponse(
+            {"detail": "query timeout", "budget_s": budget / 1000, "retry_after": RETRY_AFTER_S},
+            status_code=503,
+            headers={"Retry-After": str(RETRY_AFTER_S)},
+        )
+    return templates.TemplateResponse(
+        "503.html",
+        {"request": request, "budget_s": budget / 1000, "retry_after": RETRY_AFTER_S,
+         "q": request.query_params.get("q", "")},
+        status_code=503,
+        headers={"Retry-After": str(RETRY_AFTER_S)},
+    )
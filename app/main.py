@@ -1,12 +1,51 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import home, orders, servers, validate_servers, assets, upload_assets, add_order, sites, ips, catalog, vlans, assets_json, upload_assets
-app = FastAPI()
+from app.routers import home, orders, servers_warehouse, poolservers, validate_servers, assets, upload_assets, add_order, sites, ips, catalog, vlans, assets_json, upload_assets, macs, metrics, admin, autocomplete, health
+from app import warmup
+from app.db import replicas
+from app.db.database import ping
+from app.routers.services import reference
+from app.metrics import PrometheusMiddleware, instrument_templates
+from app.compression import CompressionMiddleware
+from app.deadlines import QueryDeadlineMiddleware, query_timeout_handler
+from app.serialization import JSONResponse
+from psycopg2.errors import QueryCanceled
+
+# every router that renders HTML (template warmup + render time metrics)
+TEMPLATE_MODULES = (home, orders, servers_warehouse, poolservers, validate_servers, assets, upload_assets, add_order, sites, ips, catalog, vlans)
+
+
+def _warm_connections() -> None:
+    ping()            # primary reachable (raises otherwise)
+    replicas.warm()   # replica health known before the first read (falls back to the primary anyway)
+
+
+# run in parallel by the lifespan, /readyz waits for the required ones (app/warmup.py)
+warmup.step("connections", _warm_connections)
+warmup.step("templates", lambda: warmup.compile_templates([m.templates for m in TEMPLATE_MODULES]))
+warmup.step("reference", reference.load_all)
+warmup.step("dell_detail", orders.prewarm_dell_details, required=False)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warmup.run()
+    yield
+
+
+# routes returning plain dicts/lists are rendered with orjson too (app/serialization.py)
+app = FastAPI(default_response_class=JSONResponse, lifespan=lifespan)
+
+# statement_timeout exceeded -> 503 page (app/deadlines.py)
+app.add_exception_handler(QueryCanceled, query_timeout_handler)
 
 app.include_router(home.router)
 app.include_router(orders.router)
-app.include_router(servers.router)
+app.include_router(servers_warehouse.router)
+app.include_router(poolservers.router)
 app.include_router(validate_servers.router)
 app.include_router(assets.router)
 app.include_router(upload_assets.router)
@@ -16,7 +55,15 @@ app.include_router(ips.router)
 app.include_router(catalog.router)
 app.include_router(vlans.router)
 app.include_router(assets_json.router)
-app.include_router(upload_assets.router)
+app.include_router(macs.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
+app.include_router(autocomplete.router)
+app.include_router(health.router)
+
+# template render time for every router that renders HTML
+for _module in TEMPLATE_MODULES:
+    instrument_templates(_module.templates)
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -27,3 +74,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+# per-route statement_timeout + cancel the running query when the client disconnects
+app.add_middleware(QueryDeadlineMiddleware)
+
+# gzip/brotli for HTML/JSON/CSV above COMPRESSION_MIN_SIZE (see app/compression.py)
+app.add_middleware(CompressionMiddleware)
+
+# outermost: times the whole request including CORS and compression (probes are not timed)
+app.add_middleware(PrometheusMiddleware, skip_paths=("/metrics", "/healthz", "/readyz"))
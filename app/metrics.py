@@ -0,0 +1,154 @@
+# app/metrics.py
+"""
+Prometheus metrics for the app (exposed on /metrics by app/routers/metrics.py).
+
+- HTTP latency per route *template* (/orders/{order_id}/dell, not the raw path)
+- DB query duration and row count per query name (orders.list, assets.count, ...)
+- Jinja template render time, CSV upload transform time
+- threadpool usage of the sync handlers (sampled at scrape time)
+
+Everything is plain prometheus_client objects, so it can be asserted on with
+generate_latest() / REGISTRY.get_sample_value() without a Prometheus server.
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Sequence
+
+import jinja2
+from prometheus_client import Counter, Gauge, Histogram
+
+# latency buckets tuned for a web app talking to Postgres (5ms .. 10s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 100000)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request duration by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being processed", multiprocess_mode="livesum")
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Database query duration (execute + fetch) by query name",
+    ["query"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_ROWS = Histogram(
+    "db_query_rows",
+    "Rows returned / affected by query name",
+    ["query"],
+    buckets=ROW_BUCKETS,
+)
+DB_QUERY_ERRORS = Counter("db_query_errors_total", "Failed queries by query name", ["query"])
+
+TEMPLATE_RENDER_DURATION = Histogram(
+    "template_render_duration_seconds",
+    "Jinja template render time",
+    ["template"],
+    buckets=LATENCY_BUCKETS,
+)
+UPLOAD_TRANSFORM_DURATION = Histogram(
+    "upload_transform_duration_seconds",
+    "CSV -> JSON transform time of asset uploads",
+    buckets=LATENCY_BUCKETS,
+)
+
+# sampled by the worker answering the scrape only
+THREADPOOL_IN_USE = Gauge("threadpool_threads_in_use", "Worker threads borrowed by sync handlers", multiprocess_mode="liveall")
+THREADPOOL_SIZE = Gauge("threadpool_threads_total", "Threadpool capacity for sync handlers", multiprocess_mode="liveall")
+
+# label used when the request did not match any route (404, static files…)
+UNMATCHED_ROUTE = "__unmatched__"
+
+
+# ---------- DB ----------
+@contextmanager
+def timed_query(name: str) -> Iterator[None]:
+    """Time an arbitrary block of DB work under `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        DB_QUERY_ERRORS.labels(name).inc()
+        raise
+    finally:
+        DB_QUERY_DURATION.labels(name).observe(time.perf_counter() - start)
+
+
+def timed_execute(cur, name: str, sql: str, params: Optional[Sequence[Any]] = None) -> None:
+    """
+    cur.execute() recording duration and row count under `name`.
+    psycopg2 client-side cursors have the full result after execute(),
+    so rowcount is the number of rows the caller will fetch.
+    """
+    with timed_query(name):
+        cur.execute(sql, params)
+    DB_QUERY_ROWS.labels(name).observe(max(cur.rowcount, 0))
+
+
+# ---------- templates ----------
+class TimedTemplate(jinja2.Template):
+    """jinja2.Template recording render time; plugged via Environment.template_class."""
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        start = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            TEMPLATE_RENDER_DURATION.labels(self.name or "<string>").observe(time.perf_counter() - start)
+
+
+def instrument_templates(templates) -> None:
+    """Make a Jinja2Templates instance record render times (call before first render)."""
+    templates.env.template_class = TimedTemplate
+
+
+# ---------- threadpool ----------
+def sample_threadpool() -> None:
+    """Refresh threadpool gauges; must run inside the event loop (async handler)."""
+    from anyio import to_thread
+
+    limiter = to_thread.current_default_thread_limiter()
+    THREADPOOL_IN_USE.set(limiter.borrowed_tokens)
+    THREADPOOL_SIZE.set(limiter.total_tokens)
+
+
+# ---------- HTTP ----------
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware body buffering).
+    The route template is read from scope["route"] once routing has run,
+    so label cardinality stays bounded by the number of routes.
+    """
+
+    def __init__(self, app, skip_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = tuple(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                str(status),
+            ).observe(time.perf_counter() - start)
@@ -1,11 +1,19 @@
 # app/routers/add_order.py
-from typing import Dict, Any, List
-from fastapi import APIRouter, Request, Form
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, PlainTextResponse
+from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, Request, Form, Header, HTTPException
+from fastapi.responses import HTMLResponse, FileResponse, PlainTextResponse
 from starlette.templating import Jinja2Templates
+from pydantic import BaseModel, Field
+from psycopg2.extras import execute_values
 from pathlib import Path
 from datetime import datetime
-import os, json
+import os
+import uuid
+
+from app.deadlines import query_budget
+from app.db.database import get_connection
+from app.metrics import DB_QUERY_ROWS, timed_execute, timed_query
+from app.serialization import JSONResponse, loads, write_json
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -15,14 +23,11 @@ ORDERS_JSON_PATH = Path(os.getenv("ORDERS_JSON_PATH", "/app/uploads/orders.json"
 
 # ------------- helpers -------------
 
-def _ensure_parent(p: Path) -> None:
-    p.parent.mkdir(parents=True, exist_ok=True)
-
 def _exists_and_nonempty(p: Path) -> bool:
     if not p.exists():
         return False
     try:
-        data = json.loads(p.read_text(encoding="utf-8"))
+        data = loads(p.read_bytes())
         return isinstance(data, dict) and isinstance(data.get("orders"), list) and len(data["orders"]) > 0
     except Exception:
         # Corrupted file = still considered “in progress” (locked)
@@ -54,15 +59,13 @@ async def add_order_submit(request: Request, json_payload: str = Form(...)):
     This locks the page until the JSON is deleted via the DELETE API.
     """
     try:
-        incoming = json.loads(json_payload)
+        incoming = loads(json_payload)
         orders: List[Dict[str, Any]] = incoming.get("orders", [])
         payload = {
             "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
             "orders": orders,
         }
-        _ensure_parent(ORDERS_JSON_PATH)
-        with ORDERS_JSON_PATH.open("w", encoding="utf-8") as fh:
-            json.dump(payload, fh, indent=2, ensure_ascii=False)
+        write_json(ORDERS_JSON_PATH, payload)  # minified: machine consumer
 
         return templates.TemplateResponse(
             "add_order.html",
@@ -106,3 +109,113 @@ async def orders_json_delete():
         return PlainTextResponse("", status_code=204)
     except Exception as e:
         return JSONResponse({"detail": f"Delete failed: {e}"}, status_code=500)
+
+# ------------- API: bulk ingestion straight into t_order_servers -------------
+
+# Max lines per POST /orders/bulk (one transaction)
+ORDERS_BULK_MAX = int(os.getenv("ORDERS_BULK_MAX", "10000"))
+# rows per INSERT statement sent by execute_values
+ORDERS_BULK_PAGE = 1000
+
+class OrderLine(BaseModel):
+    po_number: str = Field(..., max_length=100)
+    project_name: str = Field(..., max_length=255)
+    business_unit: str = Field(..., max_length=100)
+    vendor: str = Field("dell", max_length=100)
+    ap_code_authorized: Optional[str] = Field(None, max_length=100)
+    status: str = Field("pending", max_length=50)
+    # same key again = same order (retries); defaults to "<Idempotency-Key header>:<line index>",
+    # else a server-generated key (returned, usable for a retry)
+    idempotency_key: Optional[str] = Field(None, max_length=200)
+
+class OrderBatch(BaseModel):
+    orders: List[OrderLine]
+
+_INSERT_SQL = """
+    INSERT INTO supchain.t_order_servers (
+        t_order_servers_po_number,
+        t_order_servers_project_name,
+        t_order_servers_business_unit,
+        t_order_servers_vendor,
+        t_order_servers_status,
+        t_order_servers_ap_code_authorized,
+        t_order_servers_idempotency_key
+    )
+    VALUES %s
+    ON CONFLICT (t_order_servers_idempotency_key) DO NOTHING
+    RETURNING t_order_servers_id, t_order_servers_idempotency_key
+"""
+
+def _validate(batch: OrderBatch, batch_key: Optional[str]) -> List[tuple]:
+    """Rows ready for INSERT, or 422 listing every invalid line."""
+    errors: List[Dict[str, Any]] = []
+    rows: List[tuple] = []
+    seen: Dict[str, int] = {}
+    for i, o in enumerate(batch.orders):
+        # model_dump() on pydantic v2, dict() on v1 (both accepted by fastapi 0.100)
+        data = o.model_dump() if hasattr(o, "model_dump") else o.dict()
+        line = {k: (v.strip() if isinstance(v, str) else v) for k, v in data.items()}
+        missing = [f for f in ("po_number", "project_name", "business_unit") if not line[f]]
+        if missing:
+            errors.append({"index": i, "error": f"champs obligatoires vides: {', '.join(missing)}"})
+            continue
+        # every row gets a key: RETURNING order is not guaranteed, ids are matched by key
+        key = line["idempotency_key"] or (f"{batch_key}:{i}" if batch_key else f"auto:{uuid.uuid4().hex}")
+        if key in seen:
+            errors.append({"index": i, "error": f"idempotency_key déjà utilisée à la ligne {seen[key]}"})
+            continue
+        seen[key] = i
+        rows.append((line["po_number"], line["project_name"], line["business_unit"],
+                     line["vendor"] or "dell", line["status"] or "pending",
+                     line["ap_code_authorized"] or None, key))
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    return rows
+
+@router.post("/orders/bulk")
+@query_budget(0)  # up to ORDERS_BULK_MAX rows in one transaction
+def orders_bulk_insert(
+    batch: OrderBatch,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Insert a batch of order lines into supchain.t_order_servers in one
+    transaction (multi-row INSERT pages via execute_values).
+
+    Lines whose idempotency key already exists are not inserted again: their
+    existing id is returned with "created": false. Lines sent without any key
+    get a generated one ("auto:<uuid>"), returned with the line. Response
+    order = input order.
+    """
+    if len(batch.orders) > ORDERS_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"Maximum {ORDERS_BULK_MAX} lignes par requête.")
+    rows = _validate(batch, idempotency_key)
+    if not rows:
+        return JSONResponse({"created": 0, "existing": 0, "orders": []})
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                with timed_query("orders.bulk_insert"):
+                    inserted = execute_values(cur, _INSERT_SQL, rows, page_size=ORDERS_BULK_PAGE, fetch=True)
+                DB_QUERY_ROWS.labels("orders.bulk_insert").observe(len(inserted))
+
+                by_key = {key: oid for oid, key in inserted}
+                created_keys = set(by_key)
+                # conflicts: the lines sent before, fetch their ids
+                replayed = [r[6] for r in rows if r[6] not in created_keys]
+                if replayed:
+                    timed_execute(cur, "orders.bulk_existing", """
+                        SELECT t_order_servers_id, t_order_servers_idempotency_key
+                        FROM supchain.t_order_servers
+                        WHERE t_order_servers_idempotency_key = ANY(%s)
+                    """, (replayed,))
+                    by_key.update({key: oid for oid, key in cur.fetchall()})
+    finally:
+        conn.close()
+
+    result = [{"index": i, "id": by_key.get(r[6]), "created": r[6] in created_keys, "idempotency_key": r[6]}
+              for i, r in enumerate(rows)]
+    n_created = sum(1 for r in result if r["created"])
+    return JSONResponse({"created": n_created, "existing": len(result) - n_created, "orders": result})
@@ -0,0 +1,20 @@
+# app/routers/admin.py
+from fastapi import APIRouter
+
+from app.db.replicas import MAX_LAG_S, replica_status
+from app.db.slow_queries import SLOW_QUERY_MS, recent_slow_queries
+from app.serialization import JSONResponse
+
+router = APIRouter()
+
+
+@router.get("/admin/slow_queries")
+def slow_queries():
+    """Recent statements above SLOW_QUERY_MS (with EXPLAIN plan when sampled)."""
+    return JSONResponse({"threshold_ms": SLOW_QUERY_MS, "queries": recent_slow_queries()})
+
+
+@router.get("/admin/replicas")
+def replicas():
+    """Read replicas from DB_READ_DSNS with their last measured lag."""
+    return JSONResponse({"max_lag_s": MAX_LAG_S, "replicas": replica_status()})
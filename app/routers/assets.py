@@ -2,13 +2,65 @@ from fastapi import APIRouter, Request, Query
 from fastapi.responses import HTMLResponse
 from starlette.templating import Jinja2Templates
 
-from app.db.database import get_connection  # same helper you already use
+from app.deadlines import query_budget
+from app.db.database import get_read_connection  # same helper you already use
+from app.metrics import timed_execute
+from app.routers.services.export import csv_export, xlsx_export
+from app.routers.services.fragments import list_response
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+# column order is the tuple order used by assets.html (a[0]..a[25])
+ASSET_COLUMNS = ",\n            ".join([
+    "t_asset_report_id",
+    "t_asset_report_date_add",
+    "t_asset_report_serial_number",
+    "t_asset_report_cfi_code",
+    "t_asset_report_region",
+    "t_asset_report_cfi_name",
+    "t_asset_report_customer_number",
+    "t_asset_report_customer_name",
+    "t_asset_report_processor_type",
+    "t_asset_report_number_socket",
+    "t_asset_report_number_core",
+    "t_asset_report_model",
+    "t_asset_report_customer_address",
+    "t_asset_report_postcode",
+    "t_asset_report_country",
+    "t_asset_report_order_number",
+    "t_asset_report_po_number",
+    "t_asset_report_bmc_mac_address",
+    "t_asset_report_memory",
+    "t_asset_report_hba",
+    "t_asset_report_boss",
+    "t_asset_report_perc",
+    "t_asset_report_nvme",
+    "t_asset_report_gpu",
+    "t_asset_report_list_hdd_json_format",
+    "t_asset_report_list_mac_nic_json_format",
+])
+
+
+def _where(q: str | None) -> tuple[str, list]:
+    """Search filter shared by the list page and the export."""
+    if not q:
+        return "", []
+    like = f"%{q}%"
+    where = """
+        WHERE
+            t_asset_report_serial_number ILIKE %s OR
+            t_asset_report_cfi_code      ILIKE %s OR
+            t_asset_report_model         ILIKE %s OR
+            t_asset_report_po_number     ILIKE %s OR
+            t_asset_report_customer_name ILIKE %s
+        """
+    return where, [like, like, like, like, like]
+
 
 @router.get("/assets", response_class=HTMLResponse)
+@router.get("/assets/fragment", response_class=HTMLResponse)  # table + pager only
+@query_budget(5000)
 def list_assets(
     request: Request,
     q: str | None = Query(None, description="search serial, CFI, model, PO, client"),
@@ -17,56 +69,20 @@ def list_assets(
 ):
     offset = (page - 1) * per_page
 
-    where = ""
-    params: list = []
-    if q:
-        where = """
-        WHERE
-            t_asset_report_serial_number ILIKE %s OR
-            t_asset_report_cfi_code      ILIKE %s OR
-            t_asset_report_model         ILIKE %s OR
-            t_asset_report_po_number     ILIKE %s OR
-            t_asset_report_customer_name ILIKE %s
-        """
-        like = f"%{q}%"
-        params.extend([like, like, like, like, like])
+    where, params = _where(q)
 
     # ----- count
-    conn = get_connection()
+    conn = get_read_connection(request)
     cur = conn.cursor()
-    cur.execute(f"SELECT COUNT(*) FROM supchain.t_asset_report {where}", params)
+    timed_execute(cur, "assets.count", f"SELECT COUNT(*) FROM supchain.t_asset_report {where}", params)
     total = cur.fetchone()[0]
 
     # ----- page rows
-    cur.execute(
+    timed_execute(
+        cur,
+        "assets.list",
         f"""
-        SELECT
-            t_asset_report_id,
-            t_asset_report_date_add,
-            t_asset_report_serial_number,
-            t_asset_report_cfi_code,
-            t_asset_report_region,
-            t_asset_report_cfi_name,
-            t_asset_report_customer_number,
-            t_asset_report_customer_name,
-            t_asset_report_processor_type,
-            t_asset_report_number_socket,
-            t_asset_report_number_core,
-            t_asset_report_model,
-            t_asset_report_customer_address,
-            t_asset_report_postcode,
-            t_asset_report_country,
-            t_asset_report_order_number,
-            t_asset_report_po_number,
-            t_asset_report_bmc_mac_address,
-            t_asset_report_memory,
-            t_asset_report_hba,
-            t_asset_report_boss,
-            t_asset_report_perc,
-            t_asset_report_nvme,
-            t_asset_report_gpu,
-            t_asset_report_list_hdd_json_format,
-            t_asset_report_list_mac_nic_json_format
+        SELECT {ASSET_COLUMNS}
         FROM supchain.t_asset_report
         {where}
         ORDER BY t_asset_report_id ASC
@@ -77,7 +93,9 @@ def list_assets(
     rows = cur.fetchall()
     conn.close()
 
-    return templates.TemplateResponse(
+    return list_response(
+        templates,
+        request,
         "assets.html",
         {
             "request": request,
@@ -88,3 +106,22 @@ def list_assets(
             "total": total,
         },
     )
+
+
+@router.get("/assets/export")
+@query_budget(0)  # XLSX is built whole in the handler thread before sending; CSV has its own thread
+def export_assets(
+    q: str | None = Query(None, description="same filter as /assets"),
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+):
+    """Full asset report (filtered like the list), streamed as CSV or XLSX."""
+    where, params = _where(q)
+    sql = f"""
+        SELECT {ASSET_COLUMNS}
+        FROM supchain.t_asset_report
+        {where}
+        ORDER BY t_asset_report_id ASC
+    """
+    if format == "xlsx":
+        return xlsx_export("assets", sql, params, "assets")
+    return csv_export("assets", sql, params, "assets")
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse
 import os
 
+from app.serialization import JSONResponse
+
 router = APIRouter()
 
 JSON_PATH = "app/static/json/assets_transformed.json"
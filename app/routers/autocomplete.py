@@ -0,0 +1,114 @@
+# app/routers/autocomplete.py
+"""
+Typeahead for the search boxes: serials, MKP hostnames and PO numbers.
+
+GET /autocomplete?q=SN00012&types=serial,po&limit=10
+
+Only prefixes are matched (case-insensitive), so every source is an index
+range scan on lower(col) text_pattern_ops (sql/autocomplete_indexes.sql),
+read in index order (ORDER BY ... USING ~<~) up to its LIMIT,
+instead of the ILIKE '%x%' scan of the list pages. All sources go in one
+UNION ALL statement (one round trip); identical concurrent keystrokes share
+its execution (app/db/singleflight.py).
+"""
+import os
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Query, Request
+
+from app.db.database import get_read_connection
+from app.db.singleflight import shared_fetch
+from app.deadlines import query_budget
+from app.serialization import JSONResponse
+
+router = APIRouter()
+
+AUTOCOMPLETE_MIN_CHARS = int(os.getenv("AUTOCOMPLETE_MIN_CHARS", "2"))
+AUTOCOMPLETE_MAX_LIMIT = 50
+# PO numbers repeat (one per asset / server): each source reads a few more
+# rows than asked so enough distinct values are left after the dedupe
+_OVERFETCH = 4
+
+# (kind, source, table, column, list page searching it); the list page gets ?q=<value>
+SOURCES = [
+    ("serial", "asset", "supchain.t_asset_report", "t_asset_report_serial_number", "/assets"),
+    ("serial", "pool", "supchain.t_poolservers", "t_poolservers_serial_number", "/pool_servers"),
+    ("serial", "warehouse", "supchain.t_server_sts", "t_server_sts_serial", None),
+    ("hostname", "pool", "supchain.t_poolservers", "t_poolservers_mkp_hostname", "/pool_servers"),
+    ("po", "order", "supchain.t_order_servers", "t_order_servers_po_number", "/orders"),
+    ("po", "asset", "supchain.t_asset_report", "t_asset_report_po_number", "/assets"),
+    ("po", "warehouse", "supchain.t_server_sts", "t_server_sts_po_number", None),
+]
+KINDS = sorted({s[0] for s in SOURCES})
+
+
+def _like_prefix(q: str) -> str:
+    """lower(q) as a LIKE prefix pattern (its own % and _ escaped)."""
+    q = q.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return q + "%"
+
+
+def _sql(sources: List[tuple]) -> str:
+    # same lower(col) expression as the indexes; ORDER BY + LIMIT per branch
+    # so each one stops after a few index entries. A text_pattern_ops index is
+    # ordered by ~<~ (byte order), not by the collation: a plain ORDER BY
+    # lower(col) would read and sort every row matching the prefix.
+    return "\nUNION ALL\n".join(
+        f"""(SELECT {i} AS src, {col} AS value
+            FROM {table}
+            WHERE lower({col}) LIKE %s
+            ORDER BY lower({col}) USING ~<~
+            LIMIT %s)"""
+        for i, (_, _, table, col, _) in enumerate(sources)
+    )
+
+
+def suggest(request: Optional[Request], q: str, kinds: List[str], limit: int) -> List[Dict[str, Any]]:
+    """Top `limit` distinct (kind, source, value) whose value starts with `q`, sorted by value."""
+    sources = [s for s in SOURCES if s[0] in kinds]
+    if not sources:
+        return []
+    pattern = _like_prefix(q)
+    params: List[Any] = []
+    for _ in sources:
+        params += [pattern, limit * _OVERFETCH]
+
+    conn = get_read_connection(request)
+    try:
+        with conn.cursor() as cur:
+            rows = shared_fetch(cur, "autocomplete", _sql(sources), params)
+    finally:
+        conn.close()
+
+    seen = set()
+    hits = []
+    for src, value in sorted(rows, key=lambda r: (r[1].lower(), r[0])):
+        kind, source, _, _, page = sources[src]
+        if (kind, source, value) in seen:
+            continue
+        seen.add((kind, source, value))
+        hits.append({
+            "kind": kind,
+            "source": source,
+            "value": value,
+            "url": f"{page}?{urlencode({'q': value})}" if page else None,
+        })
+        if len(hits) == limit:
+            break
+    return hits
+
+
+@router.get("/autocomplete")
+@query_budget(1000)  # index range scans only
+def autocomplete(
+    request: Request,
+    q: str = Query("", max_length=128),
+    types: Optional[str] = Query(None, description=f"comma separated, among {','.join(KINDS)} (default: all)"),
+    limit: int = Query(10, ge=1, le=AUTOCOMPLETE_MAX_LIMIT),
+) -> JSONResponse:
+    q = q.strip()
+    kinds = [k for k in (types or ",".join(KINDS)).split(",") if k in KINDS]
+    results = suggest(request, q, kinds, limit) if len(q) >= AUTOCOMPLETE_MIN_CHARS else []
+    # the browser reuses a prefix it already asked for (backspace, retyping)
+    return JSONResponse({"q": q, "results": results}, headers={"Cache-Control": "private, max-age=30"})
@@ -1,114 +1,102 @@
 # app/routers/catalog.py
-from typing import List, Dict, Any, Optional
+from typing import List, Any, Optional
 from fastapi import APIRouter, Request, Query
 from fastapi.responses import HTMLResponse
 from starlette.templating import Jinja2Templates
 
-from app.db.database import get_connection
+from app.db.rows import records
+from app.routers.services.export import csv_export
+from app.routers.services.reference import ReferenceTable
+from app.routers.services.fragments import list_response
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+CATALOG_COLUMNS = [
+    "t_catalog_server_id",
+    "t_catalog_server_model",
+    "t_catalog_server_vendor",
+    "t_catalog_server_reftech_id",
+    "t_catalog_server_refprod_id",
+    "t_catalog_server_comments",
+    "t_catalog_server_datetime_added",
+    "t_catalog_server_qualified",
+    "t_catalog_server_qualif_in_progress",
+    "t_catalog_server_availability",
+]
 
-def _rows_count(q: Optional[str]) -> int:
-    """Count rows with optional search."""
-    sql = """
-        SELECT COUNT(*)
-        FROM supchain.t_catalog_server c
-        {where}
-    """
-    where = ""
-    params: List[Any] = []
-    if q:
-        where = """
+
+def _where(q: Optional[str]) -> tuple[str, List[Any]]:
+    """Search filter of the export (the list page searches its in-memory snapshot)."""
+    if not q:
+        return "", []
+    where = """
             WHERE
                 LOWER(c.t_catalog_server_model)      LIKE %s OR
                 LOWER(c.t_catalog_server_vendor)     LIKE %s OR
                 LOWER(COALESCE(c.t_catalog_server_comments, '')) LIKE %s
         """
-        like = f"%{q.lower()}%"
-        params = [like, like, like]
-
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql.format(where=where), params)
-            (count,) = cur.fetchone()
-            return int(count)
+    like = f"%{q.lower()}%"
+    return where, [like, like, like]
 
 
-def _fetch_page(offset: int, limit: int, q: Optional[str]) -> List[Dict[str, Any]]:
-    """Fetch a page of catalog rows with optional search."""
-    base_sql = """
-        SELECT
-            c.t_catalog_server_id,
-            c.t_catalog_server_model,
-            c.t_catalog_server_vendor,
-            c.t_catalog_server_reftech_id,
-            c.t_catalog_server_refprod_id,
-            c.t_catalog_server_comments,
-            c.t_catalog_server_datetime_added,
-            c.t_catalog_server_qualified,
-            c.t_catalog_server_qualif_in_progress,
-            c.t_catalog_server_availability
-        FROM supchain.t_catalog_server c
-        {where}
-        ORDER BY c.t_catalog_server_id DESC
-        LIMIT %s OFFSET %s
-    """
-    where = ""
-    params: List[Any] = []
-    if q:
-        where = """
-            WHERE
-                LOWER(c.t_catalog_server_model)      LIKE %s OR
-                LOWER(c.t_catalog_server_vendor)     LIKE %s OR
-                LOWER(COALESCE(c.t_catalog_server_comments, '')) LIKE %s
-        """
-        like = f"%{q.lower()}%"
-        params = [like, like, like]
+def _select_list() -> str:
+    return ",\n            ".join(f"c.{col}" for col in CATALOG_COLUMNS)
 
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(base_sql.format(where=where), params + [limit, offset])
-            rows = cur.fetchall()
 
-    cols = [
-        "t_catalog_server_id",
-        "t_catalog_server_model",
-        "t_catalog_server_vendor",
-        "t_catalog_server_reftech_id",
-        "t_catalog_server_refprod_id",
-        "t_catalog_server_comments",
-        "t_catalog_server_datetime_added",
-        "t_catalog_server_qualified",
-        "t_catalog_server_qualif_in_progress",
-        "t_catalog_server_availability",
-    ]
-    return [dict(zip(cols, r)) for r in rows]
+# list page: in-memory copy of supchain.t_catalog_server (export still streams from the DB)
+CATALOG = ReferenceTable(
+    "catalog",
+    "supchain.t_catalog_server",
+    CATALOG_COLUMNS,
+    search_columns=["t_catalog_server_model", "t_catalog_server_vendor", "t_catalog_server_comments"],
+    default_sort="-t_catalog_server_id",
+)
 
 
 @router.get("/catalog", response_class=HTMLResponse)
-async def page_catalog(
+@router.get("/catalog/fragment", response_class=HTMLResponse)  # table + pager only
+def page_catalog(  # sync: the first load of a worker hits Postgres
     request: Request,
     q: Optional[str] = Query(None, description="Search model/vendor/comments"),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=5, le=100),
+    sort: Optional[str] = Query(None, description="column to sort on"),
+    dir: str = Query("desc", pattern="^(asc|desc)$"),
 ):
     """
-    List catalog servers with pagination and a very small search.
+    List catalog servers with pagination and a very small search,
+    served from memory (only the first request of a worker loads the table).
     """
-    total = _rows_count(q)
     offset = (page - 1) * per_page
-    rows = _fetch_page(offset, per_page, q)
+    total, rows = CATALOG.query(q, sort, dir, offset, per_page)
+    sort, desc = CATALOG.sort_key(sort, dir)
 
-    return templates.TemplateResponse(
+    return list_response(
+        templates,
+        request,
         "catalog.html",
         {
             "request": request,
-            "rows": rows,
+            "rows": records(CATALOG_COLUMNS, rows),
             "page": page,
             "per_page": per_page,
             "total": total,
             "q": q or "",
+            "sort": sort,
+            "dir": "desc" if desc else "asc",
         },
     )
+
+
+@router.get("/catalog/export")
+def export_catalog(q: Optional[str] = Query(None, description="Search model/vendor/comments")):
+    """Whole catalog (filtered like /catalog) streamed as CSV."""
+    where, params = _where(q)
+    sql = f"""
+        SELECT {_select_list()}
+        FROM supchain.t_catalog_server c
+        {where}
+        ORDER BY c.t_catalog_server_id DESC
+    """
+    return csv_export("catalog", sql, params, "catalog")
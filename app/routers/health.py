@@ -0,0 +1,36 @@
+# app/routers/health.py
+"""
+Kubernetes / OpenShift probes (deploy.yaml).
+
+- /healthz  liveness: the process and its event loop answer (no DB, no threadpool)
+- /readyz   readiness: DB reachable now + every required warmup step done
+            (app/warmup.py); 503 with the failing checks otherwise
+"""
+import psycopg2
+from fastapi import APIRouter
+
+from app import warmup
+from app.db.database import ping
+from app.serialization import JSONResponse
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+async def healthz() -> JSONResponse:
+    return JSONResponse({"status": "ok"})
+
+
+@router.get("/readyz")
+def readyz() -> JSONResponse:
+    checks = warmup.readiness()
+    try:
+        ping()
+        checks["database"] = {"status": "ok", "error": None}
+    except psycopg2.Error as e:
+        checks["database"] = {"status": "failed", "error": str(e).strip()}
+    ready = all(c["status"] == "ok" for c in checks.values())
+    return JSONResponse(
+        {"status": "ready" if ready else "not ready", "checks": checks, "prewarm": warmup.optional_status()},
+        status_code=200 if ready else 503,
+    )
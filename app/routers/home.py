@@ -1,11 +1,129 @@
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
+from psycopg2 import errors as pg_errors
 from starlette.templating import Jinja2Templates
 
+from app.deadlines import query_budget
+from app.db.database import get_connection, get_read_connection
+from app.metrics import timed_execute
+from app.serialization import JSONResponse
+
 templates = Jinja2Templates(directory="app/templates")
 
 router = APIRouter()
 
+logger = logging.getLogger("app.home")
+
+# KPIs come from supchain.mv_home_kpis (sql/home_kpis.sql): the page reads a
+# few dozen precomputed rows, never the big tables
+HOME_KPI_REFRESH_S = int(os.getenv("HOME_KPI_REFRESH_S", "60"))
+_REFRESH_LOCK_KEY = 4_039_001  # pg advisory lock: one refreshing worker at a time
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def refresh_kpis(force: bool = False) -> bool:
+    """REFRESH the KPI view unless another worker did it recently (or holds the lock)."""
+    conn = get_connection()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            if not force:
+                cur.execute("SELECT EXTRACT(EPOCH FROM now() - max(refreshed_at)) FROM supchain.mv_home_kpis")
+                age = cur.fetchone()[0]
+                if age is not None and age < HOME_KPI_REFRESH_S:
+                    return False
+            cur.execute("SELECT pg_try_advisory_lock(%s)", (_REFRESH_LOCK_KEY,))
+            if not cur.fetchone()[0]:
+                return False
+            try:
+                timed_execute(cur, "home.kpis_refresh", "REFRESH MATERIALIZED VIEW CONCURRENTLY supchain.mv_home_kpis")
+            finally:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (_REFRESH_LOCK_KEY,))
+    finally:
+        conn.close()
+    return True
+
+
+def _refresh_loop() -> None:
+    while True:
+        time.sleep(HOME_KPI_REFRESH_S)
+        try:
+            refresh_kpis()
+        except pg_errors.UndefinedTable:
+            logger.warning("supchain.mv_home_kpis missing (apply sql/home_kpis.sql); KPI refresh stopped")
+            return
+        except Exception as e:
+            logger.warning("KPI refresh failed: %s", e)
+
+
+def _ensure_refresher() -> None:
+    # started on first page view: a thread created before gunicorn forks would not survive
+    global _refresher
+    if _refresher is None and HOME_KPI_REFRESH_S > 0:
+        with _refresher_lock:
+            if _refresher is None:
+                _refresher = threading.Thread(target=_refresh_loop, name="home-kpi-refresh", daemon=True)
+                _refresher.start()
+
+
+def fetch_kpis(request: Request) -> dict | None:
+    """KPI rows grouped for the template; None when the view is not installed."""
+    conn = get_read_connection(request)
+    try:
+        with conn.cursor() as cur:
+            timed_execute(cur, "home.kpis", """
+                SELECT kpi, label, sublabel, value, refreshed_at
+                FROM supchain.mv_home_kpis
+                ORDER BY kpi, value DESC, label, sublabel
+            """)
+            rows = cur.fetchall()
+    except pg_errors.UndefinedTable:
+        return None
+    finally:
+        conn.close()
+
+    kpis = {
+        "orders_status": [],
+        "warehouse": [],
+        "warehouse_by_vendor": defaultdict(int),
+        "pending": 0,
+        "pool_state": [],
+        "refreshed_at": None,
+    }
+    for kpi, label, sublabel, value, refreshed_at in rows:
+        kpis["refreshed_at"] = refreshed_at
+        if kpi == "pending":
+            kpis["pending"] = value
+        elif kpi == "warehouse":
+            kpis["warehouse"].append((label, sublabel, value))
+            kpis["warehouse_by_vendor"][label] += value
+        elif kpi in kpis:
+            kpis[kpi].append((label, value))
+    kpis["warehouse_total"] = sum(kpis["warehouse_by_vendor"].values())
+    kpis["orders_total"] = sum(v for _, v in kpis["orders_status"])
+    kpis["pool_total"] = sum(v for _, v in kpis["pool_state"])
+    kpis["warehouse_by_vendor"] = sorted(kpis["warehouse_by_vendor"].items(), key=lambda kv: -kv[1])
+    return kpis
+
+
 @router.get("/", response_class=HTMLResponse)
-async def get_home(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+def get_home(request: Request):
+    _ensure_refresher()
+    return templates.TemplateResponse("index.html", {"request": request, "kpis": fetch_kpis(request)})
+
+
+@router.post("/home/refresh")
+@query_budget(0)  # REFRESH of the KPI view over the big tables
+def refresh_home_kpis():
+    """Recompute the home KPIs now (e.g. right after an ingestion); 409 if a refresh is already running."""
+    if not refresh_kpis(force=True):
+        return JSONResponse({"message": "Rafraîchissement déjà en cours, réessayez plus tard"}, status_code=409)
+    return JSONResponse({"message": "Indicateurs rafraîchis"})
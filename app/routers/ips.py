@@ -1,42 +1,134 @@
 # app/routers/ips.py
+import ipaddress
+
 from fastapi import APIRouter, Request, Query
 from fastapi.responses import HTMLResponse
 from starlette.templating import Jinja2Templates
-from app.db.database import get_connection  # your existing helper
+from app.deadlines import query_budget
+from app.db.database import get_read_connection  # your existing helper
+from app.routers.services.macs import normalize_mac
+from app.metrics import timed_execute
+from app.routers.services.export import csv_export
+from app.routers.services.fragments import is_fragment, list_response
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+# Lookup queries use the same expressions as the indexes in sql/ips_lookup_indexes.sql
+LOOKUP_LIMIT = 200
+
+
+def _parse_lookup(term: str | None) -> tuple[str, str] | None:
+    """
+    Classify a lookup term: ("ip", "10.12.3.44"), ("net", "10.12.0.0/16")
+    or ("mac", "aa:bb:cc:dd:ee:ff"). Anything else -> None.
+    """
+    term = (term or "").strip()
+    if not term:
+        return None
+    try:
+        return "ip", str(ipaddress.ip_address(term))
+    except ValueError:
+        pass
+    if "/" in term:
+        try:
+            return "net", str(ipaddress.ip_network(term, strict=False))
+        except ValueError:
+            pass
+    mac = normalize_mac(term)
+    return ("mac", mac) if mac else None
+
+
+def _lookup(cur, kind: str, value: str) -> dict:
+    """
+    Indexed lookup on the DHCP inventory:
+      ip/net -> networks containing it (GiST >>=) + leases inside it (GiST <<=)
+      mac    -> leases holding that MAC (btree on normalised macaddr)
+    """
+    networks: list = []
+    if kind in ("ip", "net"):
+        timed_execute(
+            cur,
+            "ips.lookup_networks",
+            """
+            SELECT
+              t_ref_dhcp_id,
+              t_ref_dhcp_t_site,
+              t_ref_dhcp_id_lan,
+              t_ref_dhcp_network,
+              t_ref_dhcp_infoblox,
+              t_ref_dhcp_availability
+            FROM supchain.t_ref_dhcp
+            WHERE supchain.f_inet_or_null(t_ref_dhcp_network) >>= %s::inet
+            ORDER BY masklen(supchain.f_inet_or_null(t_ref_dhcp_network)) DESC, t_ref_dhcp_id
+            LIMIT %s
+            """,
+            (value, LOOKUP_LIMIT),
+        )
+        networks = cur.fetchall()
+        lease_where = "supchain.f_inet_or_null(t_result_dhcp_ip) <<= %s::inet"
+    else:
+        lease_where = "supchain.f_macaddr_or_null(t_result_dhcp_mac_address) = %s::macaddr"
+
+    # same column order as the children rows of the list view
+    timed_execute(
+        cur,
+        f"ips.lookup_leases_{kind}",
+        f"""
+        SELECT
+          t_result_dhcp_id_ref_dhcp,
+          t_result_dhcp_id,
+          t_result_dhcp_host_a,
+          t_result_dhcp_ip,
+          t_result_dhcp_mac_address,
+          t_result_dhcp_date_add,
+          t_result_dhcp_date_update
+        FROM supchain.t_result_dhcp
+        WHERE {lease_where}
+        ORDER BY t_result_dhcp_id
+        LIMIT %s
+        """,
+        (value, LOOKUP_LIMIT),
+    )
+    leases = cur.fetchall()
+    return {"kind": kind, "value": value, "networks": networks, "leases": leases}
+
+
+def _where(q: str | None) -> tuple[str, list]:
+    """Search filter shared by the list page and the export."""
+    if not q:
+        return "", []
+    like = f"%{q.lower()}%"
+    where_sql = """
+        WHERE
+          LOWER(CAST(t_ref_dhcp_id AS TEXT))   LIKE %s OR
+          LOWER(CAST(t_ref_dhcp_t_site AS TEXT)) LIKE %s OR
+          LOWER(CAST(t_ref_dhcp_id_lan AS TEXT)) LIKE %s OR
+          LOWER(t_ref_dhcp_network)            LIKE %s OR
+          LOWER(CAST(t_ref_dhcp_infoblox AS TEXT)) LIKE %s
+        """
+    return where_sql, [like, like, like, like, like]
+
 
 @router.get("/ips", response_class=HTMLResponse)
+@router.get("/ips/fragment", response_class=HTMLResponse)  # table + pager only
+@query_budget(5000)
 def list_ips(
     request: Request,
     q: str | None = "",
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
+    lookup: str | None = Query(None, description="IP, CIDR or MAC address"),
 ):
     """
     List t_ref_dhcp (parent). Each row can expand to show child rows from t_result_dhcp.
+    Optional `lookup` (IP / CIDR / MAC) answers "which network / lease" via inet/macaddr indexes.
     """
     offset = (page - 1) * per_page
 
     # Optional search on some parent fields (LOWER for case-insensitive)
-    where_sql = ""
-    params_count: list = []
-    params_rows: list = []
-
-    if q:
-        like = f"%{q.lower()}%"
-        where_sql = """
-        WHERE
-          LOWER(CAST(t_ref_dhcp_id AS TEXT))   LIKE %s OR
-          LOWER(CAST(t_ref_dhcp_t_site AS TEXT)) LIKE %s OR
-          LOWER(CAST(t_ref_dhcp_id_lan AS TEXT)) LIKE %s OR
-          LOWER(t_ref_dhcp_network)            LIKE %s OR
-          LOWER(CAST(t_ref_dhcp_infoblox AS TEXT)) LIKE %s
-        """
-        params_count.extend([like, like, like, like, like])
-        params_rows.extend([like, like, like, like, like])
+    where_sql, params_count = _where(q)
+    params_rows = list(params_count)
 
     # Count parents
     count_sql = f"""
@@ -64,13 +156,13 @@ def list_ips(
       LIMIT %s OFFSET %s
     """
 
-    conn = get_connection()
+    conn = get_read_connection(request)
     cur = conn.cursor()
 
-    cur.execute(count_sql, tuple(params_count))
+    timed_execute(cur, "ips.count", count_sql, tuple(params_count))
     total = cur.fetchone()[0]
 
-    cur.execute(rows_sql, tuple(params_rows + [per_page, offset]))
+    timed_execute(cur, "ips.list", rows_sql, tuple(params_rows + [per_page, offset]))
     parent_rows = cur.fetchall()
 
     # Build children map: { ref_dhcp_id: [ ...child rows... ] }
@@ -92,14 +184,25 @@ def list_ips(
           WHERE t_result_dhcp_id_ref_dhcp = ANY(%s)
           ORDER BY t_result_dhcp_id
         """
-        cur.execute(sql_children, (parent_ids,))
+        timed_execute(cur, "ips.children", sql_children, (parent_ids,))
         for row in cur.fetchall():
             ref_id = row[0]
             children_map.setdefault(ref_id, []).append(row)
 
+    lookup_result = None
+    lookup_error = None
+    if lookup and not is_fragment(request):  # the lookup card is not part of the fragment
+        parsed = _parse_lookup(lookup)
+        if parsed:
+            lookup_result = _lookup(cur, *parsed)
+        else:
+            lookup_error = "Adresse IP, réseau CIDR ou MAC invalide."
+
     conn.close()
 
-    return templates.TemplateResponse(
+    return list_response(
+        templates,
+        request,
         "ips.html",
         {
             "request": request,
@@ -109,5 +212,41 @@ def list_ips(
             "page": page,
             "per_page": per_page,
             "total": total,
+            "lookup": lookup or "",
+            "lookup_result": lookup_result,
+            "lookup_error": lookup_error,
         },
     )
+
+
+@router.get("/ips/export")
+def export_ips(q: str | None = ""):
+    """
+    DHCP networks (filtered like /ips) with their leases, one CSV line per
+    lease (networks without lease appear once with empty lease columns).
+    """
+    where_sql, params = _where(q)
+    return csv_export(
+        "ips",
+        f"""
+        SELECT
+          p.t_ref_dhcp_id,
+          p.t_ref_dhcp_t_site,
+          p.t_ref_dhcp_id_lan,
+          p.t_ref_dhcp_network,
+          p.t_ref_dhcp_infoblox,
+          p.t_ref_dhcp_availability,
+          c.t_result_dhcp_id,
+          c.t_result_dhcp_host_a,
+          c.t_result_dhcp_ip,
+          c.t_result_dhcp_mac_address,
+          c.t_result_dhcp_date_add,
+          c.t_result_dhcp_date_update
+        FROM (SELECT * FROM supchain.t_ref_dhcp {where_sql}) p
+        LEFT JOIN supchain.t_result_dhcp c
+          ON c.t_result_dhcp_id_ref_dhcp = p.t_ref_dhcp_id
+        ORDER BY p.t_ref_dhcp_id DESC, c.t_result_dhcp_id
+        """,
+        params,
+        "ips",
+    )
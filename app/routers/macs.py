@@ -0,0 +1,102 @@
+# app/routers/macs.py
+import os
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Body, HTTPException
+
+from app.deadlines import query_budget
+from app.db.database import get_connection, get_read_connection
+from app.metrics import timed_execute
+from app.routers.services.macs import normalize_mac
+from app.serialization import JSONResponse
+
+router = APIRouter()
+
+# Max MACs accepted by the bulk endpoint (provisioning batches)
+BULK_MAX = int(os.getenv("MAC_BULK_MAX", "5000"))
+
+# Backed by supchain.mv_mac_lookup (see sql/mac_lookup.sql)
+LOOKUP_SQL = """
+    SELECT
+        mac::text,
+        source,
+        source_id,
+        serial,
+        order_id,
+        asset_report_id,
+        ref_dhcp_id,
+        detail
+    FROM supchain.mv_mac_lookup
+    WHERE mac = ANY(%s::macaddr[])
+    ORDER BY mac, source, source_id
+"""
+
+COLS = ["mac", "source", "source_id", "serial", "order_id", "asset_report_id", "ref_dhcp_id", "detail"]
+
+
+def lookup_macs(macs: List[str]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """
+    One indexed query for any number of (normalised) MACs.
+    Returns {mac: {"order": [...], "asset": [...], "lease": [...]}}.
+    """
+    result: Dict[str, Dict[str, List[Dict[str, Any]]]] = {
+        m: {"order": [], "asset": [], "lease": []} for m in macs
+    }
+    if not macs:
+        return result
+
+    conn = get_read_connection()
+    try:
+        with conn.cursor() as cur:
+            timed_execute(cur, "macs.lookup", LOOKUP_SQL, (macs,))
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    for r in rows:
+        hit = dict(zip(COLS, r))
+        result[hit.pop("mac")][hit.pop("source")].append(hit)
+    return result
+
+
+@router.get("/macs/{mac}")
+def get_mac(mac: str):
+    norm = normalize_mac(mac)
+    if not norm:
+        raise HTTPException(status_code=400, detail="Adresse MAC invalide.")
+    return JSONResponse({"mac": norm, **lookup_macs([norm])[norm]})
+
+
+@router.post("/macs/lookup")
+def bulk_lookup(macs: List[str] = Body(..., embed=True)):
+    """
+    Bulk variant for provisioning scripts: {"macs": ["aa:bb:..", "AABB.CCDD.EEFF", ...]}.
+    Input notation is preserved in "invalid"; results are keyed by normalised MAC.
+    """
+    if len(macs) > BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"Maximum {BULK_MAX} MACs par requête.")
+
+    normalized: Dict[str, None] = {}
+    invalid: List[str] = []
+    for m in macs:
+        norm = normalize_mac(m)
+        if norm:
+            normalized[norm] = None
+        else:
+            invalid.append(m)
+
+    return JSONResponse({"results": lookup_macs(list(normalized)), "invalid": invalid})
+
+
+@router.post("/macs/refresh")
+@query_budget(0)  # REFRESH ... CONCURRENTLY of the whole MAC union
+def refresh_index():
+    """Refresh the MAC index (call after order / asset / DHCP ingestion)."""
+    conn = get_connection()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            timed_execute(cur, "macs.refresh", "REFRESH MATERIALIZED VIEW CONCURRENTLY supchain.mv_mac_lookup")
+    finally:
+        conn.close()
+    return JSONResponse({"message": "Index MAC rafraîchi"})
@@ -0,0 +1,26 @@
+# app/routers/metrics.py
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+
+from app.compression import no_compression
+from app.metrics import sample_threadpool
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+@no_compression  # scraped in-cluster, not worth the CPU
+async def metrics():
+    # async on purpose: runs on the event loop, so it never waits for a
+    # threadpool slot and can read the threadpool limiter
+    sample_threadpool()
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # gunicorn with several workers: aggregate every worker's samples
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse
 import os
 
+from app.serialization import JSONResponse
+
 router = APIRouter()
 
 # Read the same path used by the service (default /tmp…)
@@ -1,69 +1,133 @@
 # app/routers/orders.py
+import logging
+import os
+
 from fastapi import APIRouter, Request, Query
 from fastapi.responses import HTMLResponse
 from starlette.templating import Jinja2Templates
-from app.db.database import get_connection  # your existing helper
+from app.cache import VersionedCache, data_version
+from app.deadlines import query_budget
+from app.db.database import get_connection, get_read_connection  # your existing helper
+from app.db.rows import record_type
+from app.db.singleflight import shared_fetch
+from app.metrics import timed_execute
+from app.routers.services.export import csv_export
+from app.routers.services.fragments import list_response
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+logger = logging.getLogger("app.orders")
+
+
+ORDER_COLUMNS = """
+        o.t_order_servers_id,
+        o.t_order_servers_po_number,
+        o.t_order_servers_project_name,
+        o.t_order_servers_date_add,
+        o.t_order_servers_business_unit,
+        o.t_order_servers_vendor,
+        o.t_order_servers_status,
+        o.t_order_servers_ap_code_authorized,
+        ds.order_status    AS dell_status,
+        ds.status_datetime AS dell_status_datetime
+"""
+
+# latest Dell status per order: one probe of ix_dell_orders_po_status_dt
+# (sql/orders_dell_status.sql) per listed order
+DELL_STATUS_LATERAL = """
+      LEFT JOIN LATERAL (
+        SELECT d.order_status, d.status_datetime
+        FROM supchain.t_dell_orders d
+        WHERE d.purchase_order_id = o.t_order_servers_id
+        ORDER BY d.status_datetime DESC NULLS LAST
+        LIMIT 1
+      ) ds ON true
+"""
+
+# dell_status filter value for "no Dell row yet"
+NO_DELL_STATUS = "__none__"
+
+_dell_statuses_cache = VersionedCache("dell_statuses", ttl=300)
+
+
+def _where(q: str | None, dell_status: str | None = None) -> tuple[str, list]:
+    """Search + Dell status filter shared by the list page and the export."""
+    clauses, params = [], []
+    if q:
+        like = f"%{q.lower()}%"
+        clauses.append("""(
+          LOWER(o.t_order_servers_po_number)    LIKE %s OR
+          LOWER(o.t_order_servers_project_name) LIKE %s OR
+          LOWER(o.t_order_servers_vendor)       LIKE %s
+        )""")
+        params += [like, like, like]
+    if dell_status == NO_DELL_STATUS:
+        clauses.append("ds.order_status IS NULL")
+    elif dell_status:
+        clauses.append("ds.order_status = %s")
+        params.append(dell_status)
+    if not clauses:
+        return "", []
+    return "WHERE " + " AND ".join(clauses), params
+
+
+def _dell_statuses(conn) -> list[str]:
+    """Distinct Dell statuses for the filter, recomputed when t_dell_orders changes."""
+    def load() -> list[str]:
+        with conn.cursor() as cur:
+            timed_execute(cur, "orders.dell_statuses", """
+                SELECT DISTINCT order_status FROM supchain.t_dell_orders
+                WHERE order_status IS NOT NULL ORDER BY 1
+            """)
+            return [r[0] for r in cur.fetchall()]
+
+    return _dell_statuses_cache.get("all", data_version(conn, "dell_orders"), load)
+
 
 @router.get("/orders", response_class=HTMLResponse)
+@router.get("/orders/fragment", response_class=HTMLResponse)  # table + pager only
+@query_budget(5000)
 def list_orders(
     request: Request,
     q: str | None = "",
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
+    dell_status: str | None = Query(None, description=f"latest Dell status, {NO_DELL_STATUS} = none yet"),
 ):
     offset = (page - 1) * per_page
 
-    where_sql = ""
-    params_count: list = []
-    params_rows: list = []
-
-    if q:
-        like = f"%{q.lower()}%"
-        where_sql = """
-        WHERE
-          LOWER(t_order_servers_po_number)    LIKE %s OR
-          LOWER(t_order_servers_project_name) LIKE %s OR
-          LOWER(t_order_servers_vendor)       LIKE %s
-        """
-        params_count.extend([like, like, like])
-        params_rows.extend([like, like, like])
+    where_sql, params_count = _where(q, dell_status)
+    params_rows = list(params_count)
 
+    # the lateral is only needed in the count when filtering on it
     count_sql = f"""
       SELECT COUNT(*)
-      FROM supchain.t_order_servers
+      FROM supchain.t_order_servers o
+      {DELL_STATUS_LATERAL if dell_status else ""}
       {where_sql}
     """
 
     rows_sql = f"""
-      SELECT
-        t_order_servers_id,
-        t_order_servers_po_number,
-        t_order_servers_project_name,
-        t_order_servers_date_add,
-        t_order_servers_business_unit,
-        t_order_servers_vendor,
-        t_order_servers_status,
-        t_order_servers_ap_code_authorized
-      FROM supchain.t_order_servers
+      SELECT {ORDER_COLUMNS}
+      FROM supchain.t_order_servers o
+      {DELL_STATUS_LATERAL}
       {where_sql}
-      ORDER BY t_order_servers_date_add DESC, t_order_servers_id DESC
+      ORDER BY o.t_order_servers_date_add DESC, o.t_order_servers_id DESC
       LIMIT %s OFFSET %s
     """
 
-    conn = get_connection()
+    conn = get_read_connection(request)
+    dell_statuses = _dell_statuses(conn)
     cur = conn.cursor()
-    cur.execute(count_sql, tuple(params_count))
-    total = cur.fetchone()[0]
-
-    cur.execute(rows_sql, tuple(params_rows + [per_page, offset]))
-    rows = cur.fetchall()
+    # identical concurrent requests (a shared link) run these once (app/db/singleflight.py)
+    total = shared_fetch(cur, "orders.count", count_sql, tuple(params_count), fetch="one")[0]
+    rows = shared_fetch(cur, "orders.list", rows_sql, tuple(params_rows + [per_page, offset]))
     conn.close()
 
-    return templates.TemplateResponse(
+    return list_response(
+        templates,
+        request,
         "orders.html",
         {
             "request": request,
@@ -72,71 +136,153 @@ def list_orders(
             "page": page,
             "per_page": per_page,
             "total": total,
+            "dell_status": dell_status or "",
+            "dell_statuses": dell_statuses,
+            "no_dell_status": NO_DELL_STATUS,
         },
     )
 
 
+@router.get("/orders/export")
+def export_orders(q: str | None = "", dell_status: str | None = None):
+    """All orders (filtered like /orders) streamed as CSV."""
+    where_sql, params = _where(q, dell_status)
+    return csv_export(
+        "orders",
+        f"""
+        SELECT {ORDER_COLUMNS}
+        FROM supchain.t_order_servers o
+        {DELL_STATUS_LATERAL}
+        {where_sql}
+        ORDER BY o.t_order_servers_date_add DESC, o.t_order_servers_id DESC
+        """,
+        params,
+        "orders",
+    )
+
+
 # ---------- Dell detail (AER_BMAAS-84) + children (product -> asset_details -> mac)
-@router.get("/orders/{order_id}/dell", response_class=HTMLResponse)
-def dell_detail(request: Request, order_id: int):
-    """
-    Read-only detail page:
-    t_order_servers -> t_dell_orders -> t_product_info
-                                    -> t_asset_details (via product_info_id)
-                                    -> t_mac_address  (via asset_details_id)
-    No extra API calls.
-    """
+# Cached per order: an entry is reused while the 'dell_orders' data version
+# (sql/cache_versions.sql, one PK lookup) has not moved; when it moved, a cheap
+# per-order fingerprint decides whether *this* order changed.
+DELL_CACHE_SIZE = int(os.getenv("DELL_CACHE_SIZE", "500"))
+# orders in these statuses are not prewarmed (lowercase, comma separated)
+DELL_PREWARM_SKIP = [s.strip() for s in os.getenv(
+    "DELL_PREWARM_SKIP_STATUSES", "delivered,cancelled,livrée,annulée").split(",") if s.strip()]
 
-    conn = get_connection()
-    cur = conn.cursor()
+_dell_cache = VersionedCache("dell_detail", maxsize=DELL_CACHE_SIZE)
+
+DELL_HEAD_SQL = """
+  SELECT
+    d.order_number, d.order_date, d.quote_number, d.order_status, d.status_datetime
+  FROM supchain.t_order_servers s
+  LEFT JOIN supchain.t_dell_orders d
+    ON s.t_order_servers_id = d.purchase_order_id
+  WHERE s.t_order_servers_id = %s
+  ORDER BY d.id NULLS LAST
+  LIMIT 1
+"""
+
+# IMPORTANT: we pull d.order_status AS prod_status for each product line.
+DELL_ROWS_SQL = """
+  SELECT
+    p.id                           AS product_id,
+    p.sku_number,
+    p.description,
+    p.item_quantity,
+    p.line_of_business,
+    d.order_status                 AS prod_status,   -- per-line status from DB
+    ad.id                          AS asset_id,
+    ad.service_tag,
+    ad.asset_tag,
+    ma.mac_address,
+    ma.mac_type
+  FROM supchain.t_order_servers s
+  LEFT JOIN supchain.t_dell_orders d
+    ON s.t_order_servers_id = d.purchase_order_id
+  LEFT JOIN supchain.t_product_info p
+    ON d.id = p.dell_order_id
+  LEFT JOIN supchain.t_asset_details ad
+    ON ad.product_info_id = p.id
+  LEFT JOIN supchain.t_mac_address ma
+    ON ma.asset_details_id = ad.id
+  WHERE s.t_order_servers_id = %s
+  ORDER BY p.id NULLS LAST, ad.id NULLS LAST, ma.id NULLS LAST
+"""
 
+# one short row, no payload: per level, the row count and the newest xmin
+# (the id of the transaction that last wrote a row). An insert or an in-place
+# update (MAC fix, new service tag, qty…) raises the max xmin, a delete lowers
+# the count. Only ids and system columns are read: each level is a probe of
+# its foreign key index, nothing is serialized.
+DELL_FINGERPRINT_SQL = """
+  WITH d AS (
+    SELECT d.id, d.xmin::text::bigint AS x, d.status_datetime
+    FROM supchain.t_dell_orders d
+    WHERE d.purchase_order_id = %s
+  ), p AS (
+    SELECT p.id, p.xmin::text::bigint AS x
+    FROM supchain.t_product_info p JOIN d ON p.dell_order_id = d.id
+  ), ad AS (
+    SELECT ad.id, ad.xmin::text::bigint AS x
+    FROM supchain.t_asset_details ad JOIN p ON ad.product_info_id = p.id
+  ), ma AS (
+    SELECT ma.xmin::text::bigint AS x
+    FROM supchain.t_mac_address ma JOIN ad ON ma.asset_details_id = ad.id
+  )
+  SELECT concat_ws('|',
+    (SELECT concat_ws(':', count(*), max(x), max(status_datetime)) FROM d),
+    (SELECT concat_ws(':', count(*), max(x)) FROM p),
+    (SELECT concat_ws(':', count(*), max(x)) FROM ad),
+    (SELECT concat_ws(':', count(*), max(x)) FROM ma))
+"""
+
+
+class DellProduct:
+    """One product line of a Dell order (templates read attributes, as with the former dicts)."""
+    __slots__ = ("product_id", "sku", "description", "qty", "lob", "status", "assets")
+
+    def __init__(self, product_id, sku, description, qty, lob, status):
+        self.product_id = product_id
+        self.sku = sku
+        self.description = description
+        self.qty = qty
+        self.lob = lob
+        self.status = status  # DB status
+        self.assets: list = []
+
+
+class DellAsset:
+    __slots__ = ("asset_id", "service_tag", "asset_tag", "macs")
+
+    def __init__(self, asset_id, service_tag, asset_tag):
+        self.asset_id = asset_id
+        self.service_tag = service_tag
+        self.asset_tag = asset_tag
+        self.macs: list = []
+
+
+DellMac = record_type(("mac_address", "mac_type"))
+
+
+def _dell_fingerprint(cur, order_id: int) -> str:
+    timed_execute(cur, "dell_detail.fingerprint", DELL_FINGERPRINT_SQL, (order_id,))
+    return cur.fetchone()[0] or ""
+
+
+def _load_dell_detail(cur, order_id: int) -> tuple:
+    """(header, products) of one order: header query + flat join regrouped in Python."""
     # Header (one row from t_dell_orders; keep exactly what we had working)
-    head_sql = """
-      SELECT
-        d.order_number, d.order_date, d.quote_number, d.order_status, d.status_datetime
-      FROM supchain.t_order_servers s
-      LEFT JOIN supchain.t_dell_orders d
-        ON s.t_order_servers_id = d.purchase_order_id
-      WHERE s.t_order_servers_id = %s
-      ORDER BY d.id NULLS LAST
-      LIMIT 1
-    """
-    cur.execute(head_sql, (order_id,))
+    timed_execute(cur, "dell_detail.header", DELL_HEAD_SQL, (order_id,))
     header = cur.fetchone()  # tuple or None
 
     # Flat rows for product + asset + mac (LEFT JOINs so it's safe when missing)
-    # IMPORTANT: we pull d.order_status AS prod_status for each product line.
-    rows_sql = """
-      SELECT
-        p.id                           AS product_id,
-        p.sku_number,
-        p.description,
-        p.item_quantity,
-        p.line_of_business,
-        d.order_status                 AS prod_status,   -- per-line status from DB
-        ad.id                          AS asset_id,
-        ad.service_tag,
-        ad.asset_tag,
-        ma.mac_address,
-        ma.mac_type
-      FROM supchain.t_order_servers s
-      LEFT JOIN supchain.t_dell_orders d
-        ON s.t_order_servers_id = d.purchase_order_id
-      LEFT JOIN supchain.t_product_info p
-        ON d.id = p.dell_order_id
-      LEFT JOIN supchain.t_asset_details ad
-        ON ad.product_info_id = p.id
-      LEFT JOIN supchain.t_mac_address ma
-        ON ma.asset_details_id = ad.id
-      WHERE s.t_order_servers_id = %s
-      ORDER BY p.id NULLS LAST, ad.id NULLS LAST, ma.id NULLS LAST
-    """
-    cur.execute(rows_sql, (order_id,))
+    timed_execute(cur, "dell_detail.rows", DELL_ROWS_SQL, (order_id,))
     flat_rows = cur.fetchall()
-    conn.close()
 
     # Build nested structure: products -> assets -> macs
-    products_map: dict[int, dict] = {}
+    products_map: dict[int, DellProduct] = {}
+    assets_map: dict[tuple, DellAsset] = {}
     for r in flat_rows:
         (pid, sku, desc, qty, lob, prod_status,
          aid, service_tag, asset_tag,
@@ -147,42 +293,82 @@ def dell_detail(request: Request, order_id: int):
 
         prod = products_map.get(pid)
         if not prod:
-            prod = {
-                "product_id": pid,
-                "sku": sku or "",
-                "description": desc or "",
-                "qty": qty or 0,
-                "lob": lob or "",
-                "status": prod_status or "",   # store DB status here
-                "assets": {}
-            }
+            prod = DellProduct(pid, sku or "", desc or "", qty or 0, lob or "", prod_status or "")
             products_map[pid] = prod
-        else:
+        elif not prod.status and prod_status:
             # if we didn’t set a status yet and DB provides one for this row
-            if not prod.get("status") and prod_status:
-                prod["status"] = prod_status
+            prod.status = prod_status
 
         if aid:
-            asset = prod["assets"].get(aid)
+            asset = assets_map.get((pid, aid))
             if not asset:
-                asset = {
-                    "asset_id": aid,
-                    "service_tag": service_tag or "",
-                    "asset_tag": asset_tag or "",
-                    "macs": []
-                }
-                prod["assets"][aid] = asset
+                asset = DellAsset(aid, service_tag or "", asset_tag or "")
+                assets_map[(pid, aid)] = asset
+                prod.assets.append(asset)
 
             if mac_addr:
-                asset["macs"].append({
-                    "mac_address": mac_addr,
-                    "mac_type": mac_type or ""
-                })
-
-    products = []
-    for prod in products_map.values():
-        prod["assets"] = list(prod["assets"].values())
-        products.append(prod)
+                asset.macs.append(DellMac(mac_addr, mac_type or ""))
+
+    products = list(products_map.values())
+
+    return header, products
+
+
+def _cached_dell_detail(conn, order_id: int) -> tuple:
+    """(header, products) from the cache when the order did not change."""
+    # version check first: it is the connection's first statement (see app/cache.py)
+    global_version = data_version(conn, "dell_orders")
+    cached = _dell_cache.peek(order_id)
+    if cached is not None and global_version is not None and cached[0][0] == global_version:
+        _dell_cache.record(True)
+        return cached[1]
+
+    with conn.cursor() as cur:
+        fingerprint = _dell_fingerprint(cur, order_id)
+        if cached is not None and cached[0][1] == fingerprint:
+            # something else changed: keep the entry, remember the new version
+            _dell_cache.put(order_id, (global_version, fingerprint), cached[1])
+            _dell_cache.record(True)
+            return cached[1]
+        detail = _load_dell_detail(cur, order_id)
+    _dell_cache.put(order_id, (global_version, fingerprint), detail)
+    _dell_cache.record(False)
+    return detail
+
+
+def prewarm_dell_details() -> None:
+    """Fill the cache for the most recent orders not yet delivered (optional startup warmup step, app/main.py)."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            timed_execute(cur, "dell_detail.prewarm_ids", """
+                SELECT t_order_servers_id
+                FROM supchain.t_order_servers
+                WHERE LOWER(COALESCE(t_order_servers_status, '')) <> ALL(%s)
+                ORDER BY t_order_servers_date_add DESC, t_order_servers_id DESC
+                LIMIT %s
+            """, (DELL_PREWARM_SKIP, DELL_CACHE_SIZE))
+            ids = [r[0] for r in cur.fetchall()]
+        for order_id in ids:
+            _cached_dell_detail(conn, order_id)
+            conn.rollback()  # keep every lookup in its own short transaction
+    finally:
+        conn.close()
+    logger.info("dell detail cache prewarmed with %d orders", len(ids))
+
+
+@router.get("/orders/{order_id}/dell", response_class=HTMLResponse)
+def dell_detail(request: Request, order_id: int):
+    """
+    Read-only detail page:
+    t_order_servers -> t_dell_orders -> t_product_info
+                                    -> t_asset_details (via product_info_id)
+                                    -> t_mac_address  (via asset_details_id)
+    No extra API calls.
+    """
+    conn = get_read_connection(request)
+    header, products = _cached_dell_detail(conn, order_id)
+    conn.close()
 
     return templates.TemplateResponse(
         "orders_dell.html",
@@ -1,9 +1,11 @@
 # app/routers/orders_json.py
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse
 from pathlib import Path
 import os
 
+from app.serialization import JSONResponse
+
 router = APIRouter()
 
 ORDER_JSON_PATH = os.getenv("ORDER_JSON_PATH", "/app/uploads/order.json")
@@ -1,8 +1,17 @@
+from urllib.parse import urlencode
+
 from fastapi import APIRouter, Request, Query
 from fastapi.responses import HTMLResponse
 from starlette.templating import Jinja2Templates
 
-from app.db.database import get_connection  # same helper you use elsewhere
+from app.cache import VersionedCache, data_version
+from app.deadlines import query_budget
+from app.db.database import get_read_connection  # same helper you use elsewhere
+from app.db.rows import converted_records
+from app.db.singleflight import shared_fetch
+from app.metrics import timed_execute
+from app.routers.services.export import csv_export
+from app.routers.services.fragments import list_response
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -42,6 +51,29 @@ DATETIME_COLS = {
     "t_poolservers_maintenance_date",
 }
 
+def _as_bool(val):
+    # leave bools as raw True/False; HTML will render badges
+    return bool(val) if val is not None else None
+
+
+def _as_datetime(val):
+    if val is None:
+        return None
+    try:
+        return val.strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        return str(val)
+
+
+def _cell_format(colname: str):
+    """Value converter of a column (None = raw value)."""
+    if colname in BOOL_COLS:
+        return _as_bool
+    if colname in DATETIME_COLS:
+        return _as_datetime
+    return None
+
+
 def _prettify(colname: str) -> str:
     """Turn a DB column into a human title."""
     name = colname
@@ -68,7 +100,109 @@ def _prettify(colname: str) -> str:
         parts.append(w if w.isupper() else w.capitalize())
     return " ".join(parts)
 
+# Facet flags: URL param -> boolean column (same set as the badges)
+FACET_FLAGS = {
+    "heartbeat": "t_poolservers_heartbeat",
+    "san": "t_poolservers_san",
+    "bmc": "t_poolservers_bmc",
+    "discovering": "t_poolservers_discovering",
+    "mynet": "t_poolservers_mynet",
+    "qualif": "t_poolservers_qualif",
+    "maintenance": "t_poolservers_maintenance",
+    "mkp_server_allocated": "t_poolservers_mkp_server_allocated",
+}
+FACET_LABELS = {
+    "heartbeat": "Heartbeat", "san": "SAN", "bmc": "BMC", "discovering": "Discovering",
+    "mynet": "MyNet", "qualif": "Qualif", "maintenance": "Maintenance",
+    "mkp_server_allocated": "Alloué MKP",
+}
+
+# One pass over the table: every count of the panel per (region, zone)
+_FILTERS = ",\n".join(f"COUNT(*) FILTER (WHERE {col}) AS {name}" for name, col in FACET_FLAGS.items())
+FACETS_SQL = f"""
+    SELECT
+      t_poolservers_region,
+      t_poolservers_physical_zone_target,
+      COUNT(*) AS total,
+      {_FILTERS},
+      COUNT(*) FILTER (WHERE t_poolservers_qualif
+                         AND t_poolservers_maintenance IS NOT TRUE
+                         AND t_poolservers_mkp_server_allocated IS NOT TRUE) AS available
+    FROM t_poolservers
+    GROUP BY t_poolservers_region, t_poolservers_physical_zone_target
+    ORDER BY t_poolservers_region NULLS LAST, t_poolservers_physical_zone_target NULLS LAST
+"""
+FACET_COLS = ["region", "zone", "total", *FACET_FLAGS, "available"]
+
+# region / zone value of a facet row grouping NULLs (filters with IS NULL)
+FACET_NULL = "__none__"
+
+# recomputed only when sql/cache_versions.sql reports a change (TTL without it)
+_facets_cache = VersionedCache("poolservers.facets", ttl=60)
+
+
+def _filters(request: Request) -> dict:
+    """Active facet filters from the query string: region, zone and flag=1/0."""
+    params = request.query_params
+    out = {}
+    for key in ("region", "zone"):
+        if params.get(key):
+            out[key] = params[key]
+    for name in FACET_FLAGS:
+        if params.get(name) in ("0", "1"):
+            out[name] = params[name]
+    return out
+
+
+def _where(q: str | None, filters: dict | None = None) -> tuple[str, list]:
+    """Search + facet filters shared by the list page and the export."""
+    clauses, params = [], []
+    if q:
+        like = f"%{q}%"
+        clauses.append("(" + " OR ".join([f'{c} ILIKE %s' for c in SEARCHABLE_COLS]) + ")")
+        params += [like] * len(SEARCHABLE_COLS)
+    filters = filters or {}
+    for key, col in (("region", "t_poolservers_region"), ("zone", "t_poolservers_physical_zone_target")):
+        if key not in filters:
+            continue
+        if filters[key] == FACET_NULL:
+            clauses.append(f"{col} IS NULL")
+        else:
+            clauses.append(f"{col} = %s")
+            params.append(filters[key])
+    for name, col in FACET_FLAGS.items():
+        if name in filters:
+            # "= true" matches the partial indexes of sql/poolservers_facets.sql;
+            # NULL counts as "Non", like the badges
+            clauses.append(f"{col} = true" if filters[name] == "1" else f"{col} IS NOT TRUE")
+    if not clauses:
+        return "", []
+    return "WHERE " + " AND ".join(clauses), params
+
+
+def _facets(conn) -> list[dict]:
+    """Facet panel rows (per region / zone), cached per data version."""
+    def load() -> list[dict]:
+        with conn.cursor() as cur:
+            timed_execute(cur, "poolservers.facets", FACETS_SQL)
+            return [dict(zip(FACET_COLS, r)) for r in cur.fetchall()]
+
+    return _facets_cache.get("all", data_version(conn, "poolservers"), load)
+
+
+def _facet_url(q: str, per_page: int, filters: dict, **change) -> str:
+    """/pool_servers URL with `filters` updated by `change` (None removes a key)."""
+    params = {**filters, **change}
+    params = {k: v for k, v in params.items() if v is not None}
+    if q:
+        params["q"] = q
+    params["per_page"] = per_page
+    return "/pool_servers?" + urlencode(params)
+
+
 @router.get("/pool_servers", response_class=HTMLResponse)
+@router.get("/pool_servers/fragment", response_class=HTMLResponse)  # table + pager only
+@query_budget(5000)  # 8-column ILIKE search
 def pool_servers(
     request: Request,
     q: str | None = Query(None),
@@ -77,23 +211,21 @@ def pool_servers(
 ):
     offset = (page - 1) * per_page
 
-    where = ""
-    params: list = []
-    if q:
-        like = f"%{q}%"
-        ors = " OR ".join([f'{c} ILIKE %s' for c in SEARCHABLE_COLS])
-        where = f"WHERE {ors}"
-        params.extend([like] * len(SEARCHABLE_COLS))
+    filters = _filters(request)
+    where, params = _where(q, filters)
 
-    conn = get_connection()
+    conn = get_read_connection(request)
+    # version check must be the first statement of the connection (see app/cache.py)
+    facets = _facets(conn)
     cur = conn.cursor()
 
-    # total count
-    cur.execute(f"SELECT COUNT(*) FROM t_poolservers {where}", params)
-    total = cur.fetchone()[0]
+    # total count (identical concurrent requests share one execution, app/db/singleflight.py)
+    total = shared_fetch(cur, "poolservers.count", f"SELECT COUNT(*) FROM t_poolservers {where}", params, fetch="one")[0]
 
     # page rows (select * so we automatically get new cols in the future)
-    cur.execute(
+    colnames, rows = shared_fetch(
+        cur,
+        "poolservers.list",
         f"""
         SELECT * 
         FROM t_poolservers
@@ -102,41 +234,67 @@ def pool_servers(
         LIMIT %s OFFSET %s
         """,
         params + [per_page, offset],
+        fetch="columns",
     )
-    rows = cur.fetchall()
-    colnames = [c.name for c in cur.description]
     conn.close()
 
-    # format rows in a template-friendly way
-    formatted = []
-    for row in rows:
-        item = {}
-        for key, val in zip(colnames, row):
-            if key in BOOL_COLS:
-                # leave bools as raw True/False; HTML will render badges
-                item[key] = bool(val) if val is not None else None
-            elif key in DATETIME_COLS and val is not None:
-                try:
-                    item[key] = val.strftime("%Y-%m-%d %H:%M:%S")
-                except Exception:
-                    item[key] = str(val)
-            else:
-                item[key] = val
-        formatted.append(item)
+    # format rows in a template-friendly way (one record per row, see app/db/rows.py)
+    formatted = converted_records(colnames, rows, _cell_format)
 
     # build pretty headers & a stable column order
     headers = [{"raw": c, "title": _prettify(c)} for c in colnames]
 
-    return templates.TemplateResponse(
-        "poolservers.html",
+    # clickable facet counts: each one narrows the table to its region/zone/flag
+    facet_rows = []
+    for f in facets:
+        # a NULL region/zone must stay a filter, not drop out of the URL
+        scope = {k: FACET_NULL if f[k] is None else f[k] for k in ("region", "zone")}
+        cells = [{"label": FACET_LABELS[name], "count": f[name],
+                  "url": _facet_url(q or "", per_page, scope, **{name: "1"})} for name in FACET_FLAGS]
+        facet_rows.append({
+            "region": f["region"],
+            "zone": f["zone"],
+            "total": f["total"],
+            "url": _facet_url(q or "", per_page, scope),
+            "available": f["available"],
+            "available_url": _facet_url(q or "", per_page, scope, qualif="1", maintenance="0",
+                                         mkp_server_allocated="0"),
+            "cells": cells,
+        })
+    active = [{"key": k, "value": v, "display": "—" if v == FACET_NULL else v,
+               "label": FACET_LABELS.get(k, {"region": "Région", "zone": "Zone"}.get(k, k)),
+               "remove_url": _facet_url(q or "", per_page, filters, **{k: None})}
+              for k, v in filters.items()]
+
+    return list_response(
+        templates,
+        request,
+        "pool_servers.html",
         {
             "request": request,
             "headers": headers,      # [{raw, title}, …]
-            "rows": formatted,       # list[dict]
+            "rows": formatted,       # list[record]
             "page": page,
             "per_page": per_page,
             "total": total,
             "q": q or "",
             "bool_cols": BOOL_COLS,  # for badge rendering
+            "facet_labels": [FACET_LABELS[n] for n in FACET_FLAGS],
+            "facets": facet_rows,
+            "active_filters": active,
+            # keeps facet filters across pagination / export links
+            "filter_qs": urlencode(filters),
         },
     )
+
+
+@router.get("/pool_servers/export")
+def export_pool_servers(request: Request, q: str | None = Query(None)):
+    """Full pool inventory (every column, filtered like the list) streamed as CSV."""
+    where, params = _where(q, _filters(request))
+    return csv_export(
+        "poolservers",
+        f"SELECT * FROM t_poolservers {where} ORDER BY t_poolservers_id ASC",
+        params,
+        "pool_servers",
+    )
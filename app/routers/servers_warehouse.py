@@ -1,13 +1,20 @@
 # app/routers/servers_warehouse.py
 
 from typing import Any, Dict, List, Optional, Tuple
-from fastapi import APIRouter, Request, Form
+from fastapi import APIRouter, Request, Form, Body, Query, HTTPException
 from fastapi.responses import HTMLResponse
 from starlette.templating import Jinja2Templates
+from psycopg2 import errors as pg_errors
+from psycopg2.extras import Json, execute_values
 from pathlib import Path
-import os, json
+import os
 
-from app.db.database import get_connection
+from app.deadlines import query_budget
+from app.db.database import get_connection, get_read_connection
+from app.db.replicas import pin_primary
+from app.db.rows import records
+from app.metrics import timed_execute
+from app.serialization import JSONResponse, loads, write_json
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -18,12 +25,18 @@ SERVERS_JSON_PATH = Path(os.getenv("SERVERS_JSON_PATH", "/app/uploads/servers_se
 # Valeurs possibles pour Power Watt (mail)
 POWER_WATTS = [150, 200, 250, 300, 350, 400, 450, 500, 550, 600, 750, 800, 850, 900, 950]
 
+# Sélection par serveur (sql/warehouse_selection.sql): champs modifiables par PATCH
+SELECTION_FIELDS = ("ap_code_authorized", "physical_zone", "power_watt")
+SELECTION_PATCH_MAX = 5000          # changes per PATCH
+SELECTION_CHANGES_LIMIT = 10000     # max log entries per GET .../changes
+_SELECTION_LOCK_KEY = 4_043_001     # pg advisory lock: serialises writers (seq order = commit order)
+
 # ---------- Helpers SQL ----------
-def _safe_fetchall(sql: str, params: Optional[Tuple] = None) -> List[Tuple]:
-    with get_connection() as conn:
+def _safe_fetchall(name: str, sql: str, params: Optional[Tuple] = None) -> List[Tuple]:
+    with get_read_connection() as conn:
         conn.autocommit = False
         with conn.cursor() as cur:
-            cur.execute(sql, params or ())
+            timed_execute(cur, name, sql, params or ())
             rows = cur.fetchall()
         conn.commit()
         return rows
@@ -42,7 +55,7 @@ def _ensure_parent_writable(p: Path) -> None:
 
 # ---------- Lookups (combos) ----------
 def fetch_ap_codes() -> List[str]:
-    rows = _safe_fetchall("""
+    rows = _safe_fetchall("warehouse.ap_codes", """
         SELECT DISTINCT t_server_sts_t_ap_code_authorized_ap_code
         FROM supchain.t_server_sts
         WHERE t_server_sts_t_ap_code_authorized_ap_code IS NOT NULL
@@ -52,7 +65,7 @@ def fetch_ap_codes() -> List[str]:
 
 def fetch_physical_zones() -> List[str]:
     # Filtre de disponibilité = 'YES' (selon photos)
-    rows = _safe_fetchall("""
+    rows = _safe_fetchall("warehouse.physical_zones", """
         SELECT DISTINCT t_physical_zone_target
         FROM supchain.t_physical_zone
         WHERE t_physical_zone_date_availability = 'YES'
@@ -61,7 +74,7 @@ def fetch_physical_zones() -> List[str]:
     return [r[0] for r in rows if r[0]]
 
 # ---------- Données tableau ----------
-def fetch_warehouse_servers() -> List[Dict[str, Any]]:
+def fetch_warehouse_servers() -> List[Any]:
     sql = """
     SELECT
         s.t_server_sts_id                                     AS id,
@@ -82,12 +95,131 @@ def fetch_warehouse_servers() -> List[Dict[str, Any]]:
     WHERE LOWER(TRIM(s.t_server_sts_state_string)) IN ('warehouse','warehousse','warehous')
     ORDER BY s.t_server_sts_id
     """
-    rows = _safe_fetchall(sql)
+    rows = _safe_fetchall("warehouse.servers", sql)
     cols = [
         "id","po_number","vendor","model","cfi_code","serial","country","nic_count",
         "ap_code_authorized","physical_zone","power_watt","heartbeat","soki_name","san"
     ]
-    return [dict(zip(cols, r)) for r in rows]
+    return records(cols, rows)
+
+# ---------- Sélection (PATCH + journal) ----------
+def fetch_selection(request: Optional[Request] = None) -> Tuple[int, Dict[int, Dict[str, Any]]]:
+    """(last seq, server_id -> selected values); empty when the tables are not installed."""
+    conn = get_read_connection(request)
+    try:
+        with conn.cursor() as cur:
+            timed_execute(cur, "warehouse.selection", """
+                SELECT server_id, ap_code_authorized, physical_zone, power_watt, seq
+                FROM supchain.t_warehouse_selection
+            """)
+            rows = cur.fetchall()
+            timed_execute(cur, "warehouse.selection_seq",
+                          "SELECT COALESCE(MAX(seq), 0) FROM supchain.t_warehouse_selection_log")
+            seq = cur.fetchone()[0]
+    except pg_errors.UndefinedTable:
+        return 0, {}
+    finally:
+        conn.close()
+    return seq, {r[0]: dict(zip(SELECTION_FIELDS, r[1:4]), seq=r[4]) for r in rows}
+
+def _parse_changes(payload: Dict[str, Any]) -> List[Tuple[int, Optional[Dict[str, Any]]]]:
+    """[(server_id, fields to set | None = remove)], or 422 listing every invalid change."""
+    changes = payload.get("changes")
+    if not isinstance(changes, list):
+        raise HTTPException(status_code=422, detail="Corps attendu: {\"changes\": [...]}")
+    if len(changes) > SELECTION_PATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"Maximum {SELECTION_PATCH_MAX} changements par requête.")
+    errors: List[Dict[str, Any]] = []
+    parsed: List[Tuple[int, Optional[Dict[str, Any]]]] = []
+    for i, c in enumerate(changes):
+        sid = c.get("id") if isinstance(c, dict) else None
+        if not isinstance(sid, int) or isinstance(sid, bool):
+            errors.append({"index": i, "error": "id (entier) obligatoire"})
+            continue
+        if c.get("remove"):
+            parsed.append((sid, None))
+            continue
+        unknown = set(c) - {"id", "remove", *SELECTION_FIELDS}
+        if unknown:
+            errors.append({"index": i, "error": f"champs inconnus: {', '.join(sorted(unknown))}"})
+            continue
+        # PATCH: only the keys present are changed, null/"" clears the value
+        fields = {k: (c[k] if c[k] != "" else None) for k in SELECTION_FIELDS if k in c}
+        pw = fields.get("power_watt")
+        if pw is not None and pw not in POWER_WATTS:
+            errors.append({"index": i, "error": f"power_watt invalide: {pw}"})
+            continue
+        if any(v is not None and not isinstance(v, str) for k, v in fields.items() if k != "power_watt"):
+            errors.append({"index": i, "error": "ap_code_authorized / physical_zone: texte attendu"})
+            continue
+        parsed.append((sid, fields))
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    return parsed
+
+def apply_selection_changes(changes: List[Tuple[int, Optional[Dict[str, Any]]]]) -> Tuple[int, int]:
+    """Apply changes in one transaction; returns (entries logged, last seq). No-ops are not logged."""
+    ids = sorted({sid for sid, _ in changes})
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (_SELECTION_LOCK_KEY,))
+                timed_execute(cur, "warehouse.selection_current", """
+                    SELECT server_id, ap_code_authorized, physical_zone, power_watt
+                    FROM supchain.t_warehouse_selection
+                    WHERE server_id = ANY(%s)
+                """, (ids,))
+                current = {r[0]: dict(zip(SELECTION_FIELDS, r[1:])) for r in cur.fetchall()}
+
+                log: List[Tuple[int, str, Optional[Json]]] = []
+                for sid, fields in changes:
+                    before = current.get(sid)
+                    if fields is None:
+                        if before is not None:
+                            log.append((sid, "remove", None))
+                            current.pop(sid)
+                        continue
+                    after = dict(before or dict.fromkeys(SELECTION_FIELDS))
+                    after.update(fields)
+                    diff = {k: v for k, v in after.items() if before is None or before[k] != v}
+                    if before is None or diff:
+                        log.append((sid, "upsert", Json(diff)))
+                        current[sid] = after
+                if not log:
+                    cur.execute("SELECT COALESCE(MAX(seq), 0) FROM supchain.t_warehouse_selection_log")
+                    return 0, cur.fetchone()[0]
+
+                seqs = execute_values(cur, """
+                    INSERT INTO supchain.t_warehouse_selection_log (server_id, op, fields)
+                    VALUES %s RETURNING server_id, seq
+                """, log, fetch=True)
+                # one server may change twice: keep its highest seq (RETURNING order is not guaranteed)
+                last_seq: Dict[int, int] = {}
+                for sid, seq in seqs:
+                    last_seq[sid] = max(seq, last_seq.get(sid, 0))
+
+                removed = [sid for sid in last_seq if sid not in current]
+                if removed:
+                    timed_execute(cur, "warehouse.selection_remove",
+                                  "DELETE FROM supchain.t_warehouse_selection WHERE server_id = ANY(%s)", (removed,))
+                upserts = [(sid, *(current[sid][k] for k in SELECTION_FIELDS), seq)
+                           for sid, seq in last_seq.items() if sid in current]
+                if upserts:
+                    execute_values(cur, """
+                        INSERT INTO supchain.t_warehouse_selection
+                            (server_id, ap_code_authorized, physical_zone, power_watt, seq)
+                        VALUES %s
+                        ON CONFLICT (server_id) DO UPDATE SET
+                            ap_code_authorized = EXCLUDED.ap_code_authorized,
+                            physical_zone = EXCLUDED.physical_zone,
+                            power_watt = EXCLUDED.power_watt,
+                            seq = EXCLUDED.seq,
+                            updated_at = now()
+                    """, upserts)
+                return len(log), max(seq for _, seq in seqs)
+    finally:
+        conn.close()
 
 # ---------- Routes ----------
 @router.get("/servers/warehouse", response_class=HTMLResponse)
@@ -95,14 +227,17 @@ def page_warehouse(request: Request) -> HTMLResponse:
     servers = fetch_warehouse_servers()
     ap_codes = fetch_ap_codes()
     physical_zones = fetch_physical_zones()
+    selection_seq, selection = fetch_selection(request)
 
-    # Le template attend: servers, ap_codes, physical_zones, power_watts
+    # Le template attend: servers, ap_codes, physical_zones, power_watts, selection
     ctx = {
         "request": request,
         "servers": servers,
         "ap_codes": ap_codes,
         "physical_zones": physical_zones,
         "power_watts": POWER_WATTS,
+        "selection": selection,
+        "selection_seq": selection_seq,
         "message_ok": None,
         "message_error": None,
     }
@@ -115,10 +250,9 @@ def generate_json(
 ) -> HTMLResponse:
     # Écrit le JSON (sélection/valeurs modifiées) sur la PVC
     try:
-        data = json.loads(json_payload or "{}")
+        data = loads(json_payload or "{}")
         _ensure_parent_writable(SERVERS_JSON_PATH)
-        with SERVERS_JSON_PATH.open("w", encoding="utf-8") as fh:
-            json.dump(data, fh, ensure_ascii=False, indent=2)
+        write_json(SERVERS_JSON_PATH, data)  # minified: machine consumer
         message_ok = f"JSON généré: {SERVERS_JSON_PATH}"
         message_error = None
     except Exception as e:
@@ -129,13 +263,65 @@ def generate_json(
     servers = fetch_warehouse_servers()
     ap_codes = fetch_ap_codes()
     physical_zones = fetch_physical_zones()
+    selection_seq, selection = fetch_selection(request)
     ctx = {
         "request": request,
         "servers": servers,
         "ap_codes": ap_codes,
         "physical_zones": physical_zones,
         "power_watts": POWER_WATTS,
+        "selection": selection,
+        "selection_seq": selection_seq,
         "message_ok": message_ok,
         "message_error": message_error,
     }
     return templates.TemplateResponse("servers_warehouse.html", ctx)
+
+@router.patch("/servers/warehouse/selection")
+@query_budget(0)  # waits for the selection lock, up to SELECTION_PATCH_MAX rows
+def patch_selection(payload: Dict[str, Any] = Body(...)) -> JSONResponse:
+    """
+    Add / update / remove servers of the selection:
+        {"changes": [{"id": 12, "power_watt": 300}, {"id": 13, "remove": true}]}
+    Only the fields present are changed. Each effective change is appended to
+    the log; the response gives the last seq.
+    """
+    changes = _parse_changes(payload)
+    if not changes:
+        return JSONResponse({"applied": 0, "seq": fetch_selection()[0]})
+    applied, seq = apply_selection_changes(changes)
+    response = JSONResponse({"applied": applied, "seq": seq})
+    pin_primary(response)
+    return response
+
+@router.get("/servers/warehouse/selection")
+def get_selection(request: Request) -> JSONResponse:
+    """Current selection (consumer bootstrap), then poll .../changes?since=<seq>."""
+    seq, selection = fetch_selection(request)
+    servers = [{"id": sid, **{k: v[k] for k in SELECTION_FIELDS}} for sid, v in sorted(selection.items())]
+    return JSONResponse({"seq": seq, "servers": servers})
+
+@router.get("/servers/warehouse/selection/changes")
+def get_selection_changes(
+    request: Request,
+    since: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=SELECTION_CHANGES_LIMIT),
+) -> JSONResponse:
+    """Log entries with seq > since, oldest first; "more" = call again with since=seq."""
+    conn = get_read_connection(request)
+    try:
+        with conn.cursor() as cur:
+            timed_execute(cur, "warehouse.selection_changes", """
+                SELECT seq, server_id, op, fields, changed_at
+                FROM supchain.t_warehouse_selection_log
+                WHERE seq > %s
+                ORDER BY seq
+                LIMIT %s
+            """, (since, limit + 1))
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    changes = [{"seq": r[0], "id": r[1], "op": r[2], "fields": r[3], "changed_at": r[4]} for r in rows]
+    return JSONResponse({"since": since, "seq": rows[-1][0] if rows else since, "more": more, "changes": changes})
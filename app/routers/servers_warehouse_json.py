@@ -1,8 +1,10 @@
 # app/routers/servers_warehouse_json.py
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse
 import os
 
+from app.serialization import JSONResponse
+
 router = APIRouter()
 
 JSON_PATH = os.getenv("SERVERS_JSON_PATH", "/app/uploads/servers_selection.json")
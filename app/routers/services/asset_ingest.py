@@ -0,0 +1,141 @@
+"""
+Dedupe and row-level diff of vendor asset CSVs (sql/asset_uploads.sql).
+
+Vendors often resend the same file, or a file where only a few servers
+changed. On receipt the CSV is hashed while it is saved:
+- the same file as the last import (same sha256) is answered from
+  t_asset_upload without transforming anything
+- otherwise every transformed row is fingerprinted and compared, per
+  SerialNumber, with the last fingerprint sent downstream: only new or
+  changed rows are written to the JSON
+
+When the tables are not installed every row is treated as new (previous
+behaviour).
+"""
+import hashlib
+import logging
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from psycopg2 import errors as pg_errors
+from psycopg2.extras import execute_values
+
+from app.db.database import get_connection
+from app.metrics import timed_execute
+from app.serialization import dumps
+
+logger = logging.getLogger("app.asset_ingest")
+
+_CHUNK = 1 << 20
+
+
+def save_and_hash(src: BinaryIO, dst: BinaryIO) -> str:
+    """Copy the upload to `dst`, returning the sha256 of its bytes (one pass)."""
+    h = hashlib.sha256()
+    while True:
+        chunk = src.read(_CHUNK)
+        if not chunk:
+            return h.hexdigest()
+        h.update(chunk)
+        dst.write(chunk)
+
+
+def fingerprint(row: Dict[str, Any]) -> bytes:
+    # rows are built in a fixed key order (services/assets.py), so equal content = equal bytes
+    return hashlib.blake2b(dumps(row), digest_size=16).digest()
+
+
+def find_last_upload(sha256: str) -> Optional[Dict[str, Any]]:
+    """
+    Summary of the most recent import when it was this very file, or None.
+    Only the last one counts: after A, B (changing serial X), A again, the
+    third upload must send X's values back, which the row diff does.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            timed_execute(cur, "asset_upload.find", """
+                SELECT sha256, filename, rows_total, rows_added, rows_changed, rows_unchanged, uploaded_at
+                FROM supchain.t_asset_upload
+                ORDER BY uploaded_at DESC
+                LIMIT 1
+            """)
+            row = cur.fetchone()
+    except pg_errors.UndefinedTable:
+        logger.warning("supchain.t_asset_upload missing (apply sql/asset_uploads.sql): no upload dedupe")
+        return None
+    finally:
+        conn.close()
+    if row is None or row[0] != sha256:
+        return None
+    return {"filename": row[1], "total": row[2], "added": row[3], "changed": row[4],
+            "unchanged": row[5], "uploaded_at": row[6]}
+
+
+def diff_rows(rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int], Dict[str, bytes]]:
+    """
+    (rows to send downstream, added/changed/unchanged counts, fingerprints to store).
+    Rows without SerialNumber cannot be tracked and are always sent (counted as added).
+    """
+    serials = sorted({r["SerialNumber"] for r in rows if r.get("SerialNumber")})
+    known: Dict[str, bytes] = {}
+    if serials:
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                timed_execute(cur, "asset_upload.fingerprints", """
+                    SELECT serial_number, fingerprint
+                    FROM supchain.t_asset_fingerprint
+                    WHERE serial_number = ANY(%s)
+                """, (serials,))
+                known = {s: bytes(fp) for s, fp in cur.fetchall()}
+        except pg_errors.UndefinedTable:
+            logger.warning("supchain.t_asset_fingerprint missing (apply sql/asset_uploads.sql): no row diff")
+        finally:
+            conn.close()
+
+    emit: List[Dict[str, Any]] = []
+    new_fps: Dict[str, bytes] = {}
+    counts = {"added": 0, "changed": 0, "unchanged": 0}
+    for row in rows:
+        serial = row.get("SerialNumber")
+        fp = fingerprint(row)
+        previous = new_fps.get(serial, known.get(serial)) if serial else None
+        if previous == fp:
+            counts["unchanged"] += 1
+            continue
+        counts["added" if previous is None else "changed"] += 1
+        emit.append(row)
+        if serial:
+            new_fps[serial] = fp  # a serial repeated in the file compares against its previous line
+    return emit, counts, new_fps
+
+
+def record_upload(sha256: str, filename: Optional[str], total: int, counts: Dict[str, int],
+                  fingerprints: Dict[str, bytes]) -> None:
+    """Store the file hash and the fingerprints sent downstream (one transaction)."""
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                timed_execute(cur, "asset_upload.record", """
+                    INSERT INTO supchain.t_asset_upload
+                        (sha256, filename, rows_total, rows_added, rows_changed, rows_unchanged)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (sha256) DO UPDATE SET
+                        filename = EXCLUDED.filename, rows_total = EXCLUDED.rows_total,
+                        rows_added = EXCLUDED.rows_added, rows_changed = EXCLUDED.rows_changed,
+                        rows_unchanged = EXCLUDED.rows_unchanged, uploaded_at = now()
+                """, (sha256, filename, total, counts["added"], counts["changed"], counts["unchanged"]))
+                if fingerprints:
+                    execute_values(cur, """
+                        INSERT INTO supchain.t_asset_fingerprint (serial_number, fingerprint, upload_sha256)
+                        VALUES %s
+                        ON CONFLICT (serial_number) DO UPDATE SET
+                            fingerprint = EXCLUDED.fingerprint,
+                            upload_sha256 = EXCLUDED.upload_sha256,
+                            updated_at = now()
+                    """, [(s, fp, sha256) for s, fp in fingerprints.items()], page_size=1000)
+    except pg_errors.UndefinedTable:
+        pass  # already logged by find_last_upload / diff_rows
+    finally:
+        conn.close()
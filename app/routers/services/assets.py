@@ -1,7 +1,9 @@
-import os, csv, json
+import os, csv
 from typing import List, Dict, Any
 from pathlib import Path
 
+from app.serialization import write_json
+
 # Store the final JSON in /tmp by default (OCP-friendly, no root)
 JSON_OUTPUT_PATH = os.getenv("JSON_OUTPUT_PATH", "/tmp/assets/json/assets_transformed.json")
 
@@ -67,9 +69,9 @@ def _validate_headers(header: List[str]):
     if unknown:
         raise ValueError(f"Colonnes non autorisées: {', '.join(unknown)}")
 
-def transform_csv_to_json(csv_path: str) -> str:
+def transform_csv(csv_path: str) -> List[Dict[str, Any]]:
     """
-    Read vendor CSV and write compact JSON to JSON_OUTPUT_PATH.
+    Read vendor CSV into the JSON row shape.
     - HDD grouped under 'hdd': { "hdd1": "...", ... }
     - NIC+EMBMAC grouped under 'network': { "nic1": "...", "embmac1": "...", ... }
     """
@@ -113,9 +115,12 @@ def transform_csv_to_json(csv_path: str) -> str:
 
             rows_out.append(obj)
 
-    out_path = Path(JSON_OUTPUT_PATH)
-    out_path.parent.mkdir(parents=True, exist_ok=True)  # /tmp is writable
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump(rows_out, f, ensure_ascii=False, indent=2)
+    return rows_out
 
-    return str(out_path)
+def write_assets_json(rows: List[Dict[str, Any]]) -> str:
+    # minified, written atomically (/tmp is writable)
+    return str(write_json(JSON_OUTPUT_PATH, rows))
+
+def transform_csv_to_json(csv_path: str) -> str:
+    """Read vendor CSV and write compact JSON to JSON_OUTPUT_PATH."""
+    return write_assets_json(transform_csv(csv_path))
@@ -0,0 +1,183 @@
+"""
+Streaming exports of the list views.
+
+CSV goes through Postgres `COPY (SELECT ...) TO STDOUT`: the server formats
+the rows and psycopg2 hands us raw CSV chunks, which are relayed to the
+client through a small bounded queue. Memory stays constant whatever the
+table size and no per-row Python object is created.
+
+XLSX (asset report) uses a server-side cursor + xlsxwriter in constant_memory
+mode, spooled to a temp file and streamed back. It is NOT streamed end to
+end: an .xlsx is a zip whose directory is written last, so the whole workbook
+is built before the first byte goes out and time-to-first-byte grows with the
+result. Memory stays constant; the route opts out of the query budget
+(@query_budget(0) on /assets/export). Use CSV for large extracts.
+"""
+import os
+import queue
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.db.database import get_read_connection
+from app.metrics import timed_query
+
+# queue depth x COPY chunk (~8 KB from libpq) = max buffered per export
+EXPORT_QUEUE_CHUNKS = int(os.getenv("EXPORT_QUEUE_CHUNKS", "64"))
+XLSX_FETCH_ROWS = 5000
+
+_DONE = object()
+
+
+class _ExportResponse(StreamingResponse):
+    """StreamingResponse that stops its producer as soon as the response ends (sent, failed or client gone)."""
+
+    def __init__(self, content, cancelled: threading.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.cancelled = cancelled
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # the generator's own finally only runs when it is garbage collected
+            self.cancelled.set()
+
+
+class _ExportCancelled(Exception):
+    pass
+
+
+class _QueueWriter:
+    """File-like target for copy_expert(): every write() becomes a queue item."""
+
+    def __init__(self, q: "queue.Queue[Any]", cancelled: threading.Event):
+        self.q = q
+        self.cancelled = cancelled
+
+    def write(self, data) -> int:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        # block while the client is slower than Postgres (back-pressure),
+        # but give up as soon as the client went away
+        while True:
+            if self.cancelled.is_set():
+                raise _ExportCancelled()
+            try:
+                self.q.put(data, timeout=0.5)
+                return len(data)
+            except queue.Full:
+                continue
+
+
+def _filename(base: str, ext: str) -> str:
+    return f"{base}_{datetime.now():%Y%m%d_%H%M%S}.{ext}"
+
+
+def csv_export(name: str, sql: str, params: Sequence[Any], basename: str) -> StreamingResponse:
+    """Stream `sql` (with %s params) as CSV via COPY TO STDOUT."""
+    q: "queue.Queue[Any]" = queue.Queue(maxsize=EXPORT_QUEUE_CHUNKS)
+    cancelled = threading.Event()
+
+    def produce() -> None:
+        conn = None
+        try:
+            conn = get_read_connection()
+            with conn.cursor() as cur:
+                # COPY takes no bind parameters: let psycopg2 inline them safely
+                inner = cur.mogrify(sql, list(params)).decode("utf-8")
+                with timed_query(f"export.{name}"):
+                    cur.copy_expert(
+                        f"COPY ({inner}) TO STDOUT WITH (FORMAT csv, HEADER true)",
+                        _QueueWriter(q, cancelled),
+                        size=64 * 1024,
+                    )
+            q.put(_DONE)
+        except _ExportCancelled:
+            pass
+        except Exception as e:  # surfaced to the consumer
+            q.put(e)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def consume() -> Iterator[bytes]:
+        producer = threading.Thread(target=produce, name=f"export-{name}", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = q.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+
+    return _ExportResponse(
+        consume(),
+        cancelled,
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{_filename(basename, "csv")}"'},
+    )
+
+
+def xlsx_export(name: str, sql: str, params: Sequence[Any], basename: str,
+                headers: Optional[List[str]] = None) -> StreamingResponse:
+    """
+    `sql` as an .xlsx workbook (constant memory, spooled to /tmp). Built
+    entirely before the response starts: the caller's route needs
+    @query_budget(0).
+    """
+    try:
+        import xlsxwriter
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Export XLSX indisponible (xlsxwriter non installé).")
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        wb = xlsxwriter.Workbook(path, {"constant_memory": True, "remove_timezone": True,
+                                        "default_date_format": "yyyy-mm-dd hh:mm:ss"})
+        ws = wb.add_worksheet(basename[:31])
+        with get_read_connection() as conn:
+            # named cursor = server-side: only XLSX_FETCH_ROWS rows in memory at a time
+            with conn.cursor(name=f"export_{name}") as cur:
+                cur.itersize = XLSX_FETCH_ROWS
+                with timed_query(f"export.{name}"):
+                    cur.execute(sql, list(params))
+                    row_idx = 0
+                    if headers:
+                        ws.write_row(0, 0, headers)
+                    for row in cur:
+                        if row_idx == 0 and not headers:
+                            # server-side cursors only know their columns after the first fetch
+                            ws.write_row(0, 0, [c.name for c in cur.description])
+                        row_idx += 1
+                        ws.write_row(row_idx, 0, row)
+        conn.close()
+        wb.close()
+    except Exception:
+        os.unlink(path)
+        raise
+
+    def chunks() -> Iterator[bytes]:
+        with open(path, "rb") as fh:
+            while True:
+                block = fh.read(64 * 1024)
+                if not block:
+                    return
+                yield block
+
+    return StreamingResponse(
+        chunks(),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f'attachment; filename="{_filename(basename, "xlsx")}"'},
+        background=BackgroundTask(os.unlink, path),
+    )
@@ -0,0 +1,38 @@
+"""
+List pages and their HTML fragments.
+
+Each list page is served twice by the same handler:
+- /<page>            the full page (layout, toolbar, scripts) including
+                     fragments/<template>
+- /<page>/fragment   only fragments/<template> (table + pager), used by
+                     static/fragments.js for pagination, sorting and live
+                     search without reloading the page
+
+Fragments carry an ETag and "Cache-Control: private, no-cache": the browser
+keeps them per URL and revalidates, an unchanged fragment costs a 304.
+"""
+import hashlib
+from typing import Any, Dict
+
+from fastapi import Request
+from starlette.responses import Response
+
+FRAGMENT_SUFFIX = "/fragment"
+
+
+def is_fragment(request: Request) -> bool:
+    return request.url.path.endswith(FRAGMENT_SUFFIX)
+
+
+def list_response(templates, request: Request, name: str, context: Dict[str, Any]) -> Response:
+    """Render `name`, or fragments/`name` when called on the /fragment route."""
+    if not is_fragment(request):
+        return templates.TemplateResponse(name, context)
+
+    response = templates.TemplateResponse(f"fragments/{name}", context)
+    etag = '"' + hashlib.blake2b(response.body, digest_size=12).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
@@ -0,0 +1,22 @@
+import re
+from typing import Optional
+
+_NON_HEX = re.compile(r"[^0-9a-fA-F]")
+_MAC_HEX = re.compile(r"^[0-9a-f]{12}$")
+
+
+def normalize_mac(value: Optional[str]) -> Optional[str]:
+    """
+    Return a MAC in Postgres macaddr canonical form ("aa:bb:cc:dd:ee:ff"),
+    whatever the input notation (aa-bb-.., AABB.CCDD.EEFF, aabbccddeeff).
+    None if it does not look like a MAC.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if len(value) > 17:
+        return None
+    hexdigits = _NON_HEX.sub("", value).lower()
+    if not _MAC_HEX.match(hexdigits):
+        return None
+    return ":".join(hexdigits[i:i + 2] for i in range(0, 12, 2))
@@ -0,0 +1,156 @@
+"""
+In-memory snapshots of the small reference tables (sites, VLANs, catalog).
+
+Each table is loaded once per worker into a tuple of row tuples plus a
+lowercase search string per row, then search / sort / pagination run in
+memory: the list pages do not touch Postgres at all.
+
+A snapshot is reloaded in the background, never inside a request: by the
+LISTEN thread when sql/cache_versions.sql notifies a change of its table, and
+by a one-off thread once it is older than REFERENCE_MAX_AGE_S (safety net
+when the trigger is not installed); requests keep the stale snapshot
+meanwhile. Only the first load of a worker is synchronous.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from prometheus_client import Gauge
+
+from app.cache import on_change
+from app.db.database import get_connection
+from app.metrics import timed_execute
+
+logger = logging.getLogger("app.reference")
+
+REFERENCE_MAX_AGE_S = float(os.getenv("REFERENCE_MAX_AGE_S", "300"))
+
+REFERENCE_ROWS = Gauge("reference_table_rows", "Rows in the in-memory reference snapshot",
+                       ["table"], multiprocess_mode="liveall")
+
+# separates fields in the search string so a term never matches across two columns
+_SEP = "\x1f"
+
+# every ReferenceTable created (startup warmup loads them all, see load_all)
+TABLES: List["ReferenceTable"] = []
+
+
+class _Snapshot:
+    __slots__ = ("rows", "search", "loaded_at", "_orders")
+
+    def __init__(self, rows: Tuple[tuple, ...], search: Tuple[str, ...]):
+        self.rows = rows
+        self.search = search
+        self.loaded_at = time.monotonic()
+        self._orders: Dict[int, List[int]] = {}
+
+    def order(self, col: int) -> List[int]:
+        """Row indices sorted on column `col` (NULLs last), computed once per snapshot."""
+        idx = self._orders.get(col)
+        if idx is None:
+            idx = sorted(range(len(self.rows)),
+                         key=lambda i: (self.rows[i][col] is None, self.rows[i][col] if self.rows[i][col] is not None else 0))
+            self._orders[col] = idx
+        return idx
+
+
+class ReferenceTable:
+    """
+    Read-optimised copy of one table.
+
+    columns          selected columns, in row order
+    search_columns   columns matched (case-insensitive substring) by `q`
+    default_sort     column name, prefix with "-" for descending
+    """
+
+    def __init__(self, name: str, table: str, columns: Sequence[str],
+                 search_columns: Sequence[str], default_sort: str):
+        self.name = name
+        self.table = table
+        self.columns = list(columns)
+        self.search_idx = [self.columns.index(c) for c in search_columns]
+        self.default_sort = default_sort
+        self._snap: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        TABLES.append(self)
+
+    # ---------- loading ----------
+    def _load(self) -> _Snapshot:
+        # primary, not a replica: the NOTIFY that triggers a reload comes from it
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                timed_execute(cur, f"reference.{self.name}",
+                              f"SELECT {', '.join(self.columns)} FROM {self.table}")
+                rows = tuple(cur.fetchall())
+        conn.close()
+        search = tuple(
+            _SEP.join("" if r[i] is None else str(r[i]) for i in self.search_idx).lower()
+            for r in rows
+        )
+        REFERENCE_ROWS.labels(self.name).set(len(rows))
+        return _Snapshot(rows, search)
+
+    def reload(self) -> None:
+        snap = self._load()
+        self._snap = snap  # atomic swap: readers keep the snapshot they started with
+
+    def _refresh_in_background(self) -> None:
+        """Start one reload thread unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run() -> None:
+            try:
+                self.reload()
+            except Exception as e:  # keep serving the old snapshot, retried on a later request
+                logger.warning("reference %s reload failed: %s", self.name, e)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name=f"reference-{self.name}", daemon=True).start()
+
+    def snapshot(self) -> _Snapshot:
+        snap = self._snap
+        if snap is None:
+            with self._lock:
+                if self._snap is None:
+                    self.reload()
+                    on_change(self.name, self.reload)
+                return self._snap
+        if time.monotonic() - snap.loaded_at >= REFERENCE_MAX_AGE_S:
+            self._refresh_in_background()
+        return snap
+
+    # ---------- query ----------
+    def sort_key(self, sort: Optional[str], direction: Optional[str]) -> Tuple[str, bool]:
+        """Validated (column, descending); unknown columns fall back to the default sort."""
+        if sort in self.columns:
+            return sort, direction == "desc"
+        return self.default_sort.lstrip("-"), self.default_sort.startswith("-")
+
+    def query(self, q: Optional[str], sort: Optional[str], direction: Optional[str],
+              offset: int, limit: int) -> Tuple[int, List[tuple]]:
+        """(total matching rows, rows of the requested page)."""
+        snap = self.snapshot()
+        col, desc = self.sort_key(sort, direction)
+        order = snap.order(self.columns.index(col))
+        if desc:
+            order = order[::-1]
+        if q:
+            term = q.strip().lower()
+            search = snap.search
+            order = [i for i in order if term in search[i]]
+        rows = snap.rows
+        return len(order), [rows[i] for i in order[offset:offset + limit]]
+
+
+
+def load_all() -> None:
+    """Load every reference snapshot now (startup warmup) instead of on the first page view."""
+    for table in TABLES:
+        table.snapshot()
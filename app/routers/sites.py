@@ -2,46 +2,95 @@ from fastapi import APIRouter, Request, Query
 from fastapi.responses import HTMLResponse
 from starlette.templating import Jinja2Templates
 
-from app.db.database import get_connection  # <- same helper you already use
+from app.routers.services.export import csv_export
+from app.routers.services.reference import ReferenceTable
+from app.routers.services.fragments import list_response
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+# list page: in-memory copy of supchain.t_site (export still streams from the DB)
+SITES = ReferenceTable(
+    "sites",
+    "supchain.t_site",
+    [
+        "t_site_id",
+        "t_site_address",
+        "t_site_country",
+        "t_site_code_postal",
+        "t_site_town",
+        "t_site_sys_id_itsm",
+        "t_site_contact",
+        "t_site_region",
+        "t_site_location",
+        "t_site_address_cfi",
+        "t_site_datacenter",
+    ],
+    search_columns=["t_site_id", "t_site_town", "t_site_datacenter", "t_site_sys_id_itsm",
+                    "t_site_address", "t_site_contact"],
+    default_sort="t_site_id",
+)
+
+
+def _where(q: str) -> tuple[str, list]:
+    """Search filter of the export (the list page searches its in-memory snapshot)."""
+    if not q:
+        return "", []
+    where = """
+        WHERE
+            CAST(t_site_id AS TEXT) ILIKE %s
+         OR t_site_town ILIKE %s
+         OR t_site_datacenter ILIKE %s
+         OR t_site_sys_id_itsm ILIKE %s
+         OR t_site_address ILIKE %s
+         OR t_site_contact ILIKE %s
+        """
+    term = f"%{q}%"
+    return where, [term, term, term, term, term, term]
+
 
 @router.get("/sites", response_class=HTMLResponse)
+@router.get("/sites/fragment", response_class=HTMLResponse)  # table + pager only
 def list_sites(
     request: Request,
     q: str = Query("", description="search term"),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
+    sort: str | None = Query(None, description="column to sort on"),
+    dir: str = Query("asc", pattern="^(asc|desc)$"),
 ):
     """
-    List sites from supchain.t_site with search + pagination.
-    Search applies (ILIKE) on: id, town, datacenter, sys_id_itsm, address, contact.
+    List sites with search + pagination, served from the in-memory snapshot.
+    Search matches (case-insensitive) id, town, datacenter, sys_id_itsm, address, contact.
     """
     offset = (page - 1) * per_page
-    where = ""
-    params_total = []
-    params_rows = []
+    total, rows = SITES.query(q, sort, dir, offset, per_page)
+    sort, desc = SITES.sort_key(sort, dir)
+
+    return list_response(
+        templates,
+        request,
+        "sites.html",
+        {
+            "request": request,
+            "sites": rows,
+            "q": q,
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "sort": sort,
+            "dir": "desc" if desc else "asc",
+        },
+    )
 
-    if q:
-        where = """
-        WHERE
-            CAST(t_site_id AS TEXT) ILIKE %s
-         OR t_site_town ILIKE %s
-         OR t_site_datacenter ILIKE %s
-         OR t_site_sys_id_itsm ILIKE %s
-         OR t_site_address ILIKE %s
-         OR t_site_contact ILIKE %s
-        """
-        term = f"%{q}%"
-        params_total = [term, term, term, term, term, term]
-        params_rows = [term, term, term, term, term, term]
 
-    # total
-    sql_total = f"SELECT COUNT(*) FROM supchain.t_site {where}"
-    # rows
-    sql_rows = f"""
+@router.get("/sites/export")
+def export_sites(q: str = Query("", description="search term")):
+    """All sites (filtered like /sites) streamed as CSV."""
+    where, params = _where(q)
+    return csv_export(
+        "sites",
+        f"""
         SELECT
             t_site_id,
             t_site_address,
@@ -57,26 +106,7 @@ def list_sites(
         FROM supchain.t_site
         {where}
         ORDER BY t_site_id ASC
-        LIMIT %s OFFSET %s
-    """
-
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(sql_total, params_total)
-    total = cur.fetchone()[0]
-
-    cur.execute(sql_rows, (*params_rows, per_page, offset))
-    rows = cur.fetchall()
-    conn.close()
-
-    return templates.TemplateResponse(
-        "sites.html",
-        {
-            "request": request,
-            "sites": rows,
-            "q": q,
-            "page": page,
-            "per_page": per_page,
-            "total": total,
-        },
+        """,
+        params,
+        "sites",
     )
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Request, UploadFile, File
+from typing import Optional
+from fastapi import APIRouter, Request, UploadFile, File, Form
 from fastapi.responses import HTMLResponse
 from starlette.templating import Jinja2Templates
 from pathlib import Path
-import os, shutil, uuid
+import os, shutil, uuid, contextlib
 
 # CSV -> JSON converter (your existing service)
-from app.routers.services.assets import transform_csv_to_json
+from app.deadlines import query_budget
+from app.routers.services.assets import transform_csv, write_assets_json
+# same file again -> short-circuit; otherwise only new/changed SerialNumbers go downstream
+from app.routers.services.asset_ingest import diff_rows, find_last_upload, record_upload, save_and_hash
+from app.metrics import UPLOAD_TRANSFORM_DURATION
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -38,9 +43,11 @@ async def get_upload(request: Request):
     )
 
 @router.post("/assets/upload", response_class=HTMLResponse)
-async def post_upload(
+@query_budget(0)  # fingerprints of a whole vendor file
+def post_upload(  # sync: psycopg2 ingest + file I/O run in the threadpool, not on the event loop
     request: Request,
     file: UploadFile = File(...),
+    full: Optional[str] = Form(None),
 ):
     # If locked, do not accept new uploads
     if _is_locked():
@@ -79,24 +86,53 @@ async def post_upload(
     tmp_csv = UPLOAD_DIR / tmp_name
     try:
         with tmp_csv.open("wb") as buf:
-            shutil.copyfileobj(file.file, buf)
+            sha256 = save_and_hash(file.file, buf)
 
-        # Let your service convert the CSV to JSON (it returns the produced JSON path)
-        produced_json_path = Path(transform_csv_to_json(str(tmp_csv)))
+        # Same bytes as the last import: nothing to transform nor to send
+        previous = None if full else find_last_upload(sha256)
+        if previous is not None:
+            return templates.TemplateResponse(
+                "upload_assets.html",
+                {
+                    "request": request,
+                    "locked": False,
+                    "message_ok": (
+                        f"Fichier identique au dernier import du {previous['uploaded_at']:%d/%m/%Y %H:%M} : "
+                        "rien à transmettre."
+                    ),
+                    "message_error": None,
+                    "json_path": str(ASSETS_JSON_PATH),
+                    "summary": {**previous, "duplicate": True},
+                },
+            )
 
-        # Move the produced JSON into our PV lock path (atomically replace if exists)
-        _ensure_dir(ASSETS_JSON_PATH.parent)
-        shutil.move(str(produced_json_path), str(ASSETS_JSON_PATH))
+        # Transform, then keep only the rows whose SerialNumber is new or changed
+        with UPLOAD_TRANSFORM_DURATION.time():
+            rows = transform_csv(str(tmp_csv))
+            emit, counts, fingerprints = diff_rows(rows)
+            if full:
+                emit = rows
 
-        msg = f"Fichier traité. JSON écrit : {ASSETS_JSON_PATH}"
+        if emit:
+            # Write the JSON and move it into our PV lock path (atomically replace if exists)
+            produced_json_path = Path(write_assets_json(emit))
+            _ensure_dir(ASSETS_JSON_PATH.parent)
+            shutil.move(str(produced_json_path), str(ASSETS_JSON_PATH))
+        record_upload(sha256, file.filename, len(rows), counts, fingerprints)
+
+        if emit:
+            msg = f"Fichier traité. {len(emit)} ligne(s) transmise(s), JSON écrit : {ASSETS_JSON_PATH}"
+        else:
+            msg = "Fichier traité. Aucune ligne nouvelle ou modifiée : rien à transmettre."
         return templates.TemplateResponse(
             "upload_assets.html",
             {
                 "request": request,
-                "locked": True,  # now locked
+                "locked": bool(emit),  # locked only when a JSON was produced
                 "message_ok": msg,
                 "message_error": None,
                 "json_path": str(ASSETS_JSON_PATH),
+                "summary": {"total": len(rows), **counts, "duplicate": False, "sent": len(emit)},
             },
         )
     except Exception as e:
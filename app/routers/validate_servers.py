@@ -1,32 +1,45 @@
-from fastapi import APIRouter, Request, Form, Query
+from typing import List, Optional
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, HTTPException, Request, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from starlette.templating import Jinja2Templates
-import psycopg2
-import os
+
+from app.deadlines import query_budget
+from app.db.database import get_connection, get_read_connection  # shared helper (same DB_* env vars)
+from app.db.replicas import pin_primary
+from app.metrics import timed_execute
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST", "localhost"),
-    "port": os.getenv("DB_PORT", "5432"),
-    "user": os.getenv("DB_USER", "postgres"),
-    "password": os.getenv("DB_PASSWORD", "password"),
-    "dbname": os.getenv("DB_NAME", "dell")
-}
+# form value -> migration_status it sets
+DECISIONS = {"accept": "Validated", "reject": "Rejected"}
+
 
-def get_connection():
-    return psycopg2.connect(**DB_CONFIG)
+def _decision_status(decision: str) -> str:
+    """migration_status of a posted decision; anything else is a 400."""
+    if decision not in DECISIONS:
+        raise HTTPException(status_code=400, detail=f"Décision inconnue : {decision!r} (accept ou reject).")
+    return DECISIONS[decision]
 
 @router.get("/servers/validate", response_class=HTMLResponse)
-def show_pending_validations(request: Request, page: int = Query(1, ge=1), per_page: int = Query(10, ge=1, le=100)):
+def show_pending_validations(
+    request: Request,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    done: Optional[int] = Query(None),
+    skipped: Optional[int] = Query(None),
+    decision: Optional[str] = Query(None),
+):
     offset = (page - 1) * per_page
-    conn = get_connection()
+    # replica unless this client just decided something (pin_primary cookie)
+    conn = get_read_connection(request)
     cur = conn.cursor()
-    cur.execute("SELECT COUNT(*) FROM T_ServerSts WHERE migration_status = 'PendingValidation'")
+    timed_execute(cur, "validate.count", "SELECT COUNT(*) FROM T_ServerSts WHERE migration_status = 'PendingValidation'")
     total = cur.fetchone()[0]
 
-    cur.execute("""
+    timed_execute(cur, "validate.list", """
         SELECT id, hostname, site_source, site_target, planned_date
         FROM T_ServerSts
         WHERE migration_status = 'PendingValidation'
@@ -41,15 +54,66 @@ def show_pending_validations(request: Request, page: int = Query(1, ge=1), per_p
         "servers": rows,
         "page": page,
         "per_page": per_page,
-        "total": total
+        "total": total,
+        # result summary of the last bulk decision (see handle_bulk_validation)
+        "bulk_done": done,
+        "bulk_skipped": skipped,
+        "bulk_decision": decision,
     })
 
 @router.post("/servers/validate/decision")
 def handle_validation(server_id: int = Form(...), decision: str = Form(...)):
+    status = _decision_status(decision)
     conn = get_connection()
     cur = conn.cursor()
-    status = "Validated" if decision == "accept" else "Rejected"
-    cur.execute("UPDATE T_ServerSts SET migration_status = %s WHERE id = %s", (status, server_id))
+    timed_execute(cur, "validate.decision", "UPDATE T_ServerSts SET migration_status = %s WHERE id = %s", (status, server_id))
     conn.commit()
     conn.close()
-    return RedirectResponse(url="/servers/validate", status_code=303)
+    response = RedirectResponse(url="/servers/validate", status_code=303)
+    pin_primary(response)
+    return response
+
+@router.post("/servers/validate/bulk")
+@query_budget(0)  # a whole selection of decisions in one transaction
+def handle_bulk_validation(
+    server_ids: List[int] = Form(...),
+    decision: str = Form(...),
+    page: int = Form(1),
+    per_page: int = Form(10),
+):
+    """
+    Apply one decision to many servers in a single transaction.
+    Only rows still in PendingValidation are touched, so a wave that was
+    partially decided elsewhere is reported as 'skipped' instead of overwritten.
+    """
+    status = _decision_status(decision)
+    ids = sorted(set(server_ids))
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                timed_execute(
+                    cur,
+                    "validate.bulk_decision",
+                    """
+                    UPDATE T_ServerSts
+                    SET migration_status = %s
+                    WHERE id = ANY(%s) AND migration_status = 'PendingValidation'
+                    """,
+                    (status, ids),
+                )
+                updated = cur.rowcount
+    finally:
+        conn.close()
+
+    query = urlencode({
+        "page": page,
+        "per_page": per_page,
+        "decision": decision,
+        "done": updated,
+        "skipped": len(ids) - updated,
+    })
+    response = RedirectResponse(url=f"/servers/validate?{query}", status_code=303)
+    pin_primary(response)
+    return response
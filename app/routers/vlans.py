@@ -2,21 +2,43 @@ from fastapi import APIRouter, Request, Query
 from fastapi.responses import HTMLResponse
 from starlette.templating import Jinja2Templates
 
-from app.db.database import get_connection
+from app.routers.services.export import csv_export
+from app.routers.services.reference import ReferenceTable
+from app.routers.services.fragments import list_response
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+VLAN_COLUMNS = [
+    "t_ref_set_vlan_id",
+    "t_ref_set_vlan_date_time_added",
+    "t_ref_set_vlan_vlan_target",
+    "t_ref_set_vlan_comments",
+    "t_ref_set_vlan_vlan_id",
+    "t_ref_set_vlan_physical_zone",
+    "t_ref_set_vlan_environnement",
+    "t_ref_set_vlan_trunked",
+    "t_ref_set_vlan_natif",
+    "t_ref_set_vlan_lacp",
+    "t_ref_set_vlan_scope_info_blox",
+    "t_ref_set_vlan_t_ap_code_authorized_id",
+    "t_ref_set_vlan_scope_info_blox_mkp",
+]
 
-@router.get("/vlans", response_class=HTMLResponse)
-def list_vlans(
-    request: Request,
-    q: str | None = Query(None, description="search text"),
-    page: int = Query(1, ge=1),
-    per_page: int = Query(10, ge=1, le=100),
-):
-    offset = (page - 1) * per_page
+# list page: in-memory copy of supchain.t_ref_set_vlan (export still streams from the DB)
+VLANS = ReferenceTable(
+    "vlans",
+    "supchain.t_ref_set_vlan",
+    VLAN_COLUMNS,
+    search_columns=["t_ref_set_vlan_id", "t_ref_set_vlan_vlan_target", "t_ref_set_vlan_vlan_id",
+                    "t_ref_set_vlan_physical_zone", "t_ref_set_vlan_environnement",
+                    "t_ref_set_vlan_scope_info_blox"],
+    default_sort="t_ref_set_vlan_id",
+)
 
+
+def _where(q: str | None) -> tuple[str, list]:
+    """Search filter of the export (the list page searches its in-memory snapshot)."""
     where = []
     params: list = []
 
@@ -34,38 +56,27 @@ def list_vlans(
         """)
         params += [like, like, like, like, like, like]
 
-    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+    return (("WHERE " + " AND ".join(where)) if where else ""), params
 
-    # total count
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(f"SELECT COUNT(*) FROM supchain.t_ref_set_vlan {where_sql}", params)
-            total = cur.fetchone()[0]
 
-            sql = f"""
-                SELECT
-                  t_ref_set_vlan_id,
-                  t_ref_set_vlan_date_time_added,
-                  t_ref_set_vlan_vlan_target,
-                  t_ref_set_vlan_comments,
-                  t_ref_set_vlan_vlan_id,
-                  t_ref_set_vlan_physical_zone,
-                  t_ref_set_vlan_environnement,
-                  t_ref_set_vlan_trunked,
-                  t_ref_set_vlan_natif,
-                  t_ref_set_vlan_lacp,
-                  t_ref_set_vlan_scope_info_blox,
-                  t_ref_set_vlan_t_ap_code_authorized_id,
-                  t_ref_set_vlan_scope_info_blox_mkp
-                FROM supchain.t_ref_set_vlan
-                {where_sql}
-                ORDER BY t_ref_set_vlan_id ASC
-                LIMIT %s OFFSET %s
-            """
-            cur.execute(sql, params + [per_page, offset])
-            rows = cur.fetchall()
+@router.get("/vlans", response_class=HTMLResponse)
+@router.get("/vlans/fragment", response_class=HTMLResponse)  # table + pager only
+def list_vlans(
+    request: Request,
+    q: str | None = Query(None, description="search text"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    sort: str | None = Query(None, description="column to sort on"),
+    dir: str = Query("asc", pattern="^(asc|desc)$"),
+):
+    offset = (page - 1) * per_page
+    # search / sort / page from the in-memory snapshot: no DB round trip
+    total, rows = VLANS.query(q, sort, dir, offset, per_page)
+    sort, desc = VLANS.sort_key(sort, dir)
 
-    return templates.TemplateResponse(
+    return list_response(
+        templates,
+        request,
         "vlans.html",
         {
             "request": request,
@@ -74,5 +85,37 @@ def list_vlans(
             "page": page,
             "per_page": per_page,
             "total": total,
+            "sort": sort,
+            "dir": "desc" if desc else "asc",
         },
     )
+
+
+@router.get("/vlans/export")
+def export_vlans(q: str | None = Query(None, description="search text")):
+    """All VLANs (filtered like /vlans) streamed as CSV."""
+    where_sql, params = _where(q)
+    return csv_export(
+        "vlans",
+        f"""
+        SELECT
+          t_ref_set_vlan_id,
+          t_ref_set_vlan_date_time_added,
+          t_ref_set_vlan_vlan_target,
+          t_ref_set_vlan_comments,
+          t_ref_set_vlan_vlan_id,
+          t_ref_set_vlan_physical_zone,
+          t_ref_set_vlan_environnement,
+          t_ref_set_vlan_trunked,
+          t_ref_set_vlan_natif,
+          t_ref_set_vlan_lacp,
+          t_ref_set_vlan_scope_info_blox,
+          t_ref_set_vlan_t_ap_code_authorized_id,
+          t_ref_set_vlan_scope_info_blox_mkp
+        FROM supchain.t_ref_set_vlan
+        {where_sql}
+        ORDER BY t_ref_set_vlan_id ASC
+        """,
+        params,
+        "vlans",
+    )
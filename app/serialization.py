@@ -0,0 +1,91 @@
+# app/serialization.py
+"""
+One JSON encoder for every JSON the app produces (API responses, files
+written for the downstream consumers).
+
+- orjson when installed (several times faster than the stdlib on large lists
+  of dicts), stdlib json otherwise; both emit the same compact UTF-8 output
+- psycopg2 values are encoded natively: datetime/date/time as ISO 8601,
+  Decimal as int/float (like FastAPI's jsonable_encoder), UUID as string
+- JSONResponse: drop-in replacement for fastapi.responses.JSONResponse; routes
+  that return it directly skip jsonable_encoder entirely
+- write_json(): atomic file write (temp file + rename), so a consumer never
+  reads a half-written document
+"""
+import json
+import os
+import tempfile
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Union
+
+from starlette.responses import JSONResponse as _StarletteJSONResponse
+
+try:  # optional: stdlib json when the wheel is not installed
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Types neither encoder handles natively."""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (datetime, date, time)):  # stdlib only, orjson does these itself
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", "replace")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS  # int keys -> "1", like the stdlib
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    loads = orjson.loads
+else:  # pragma: no cover
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
+
+
+class JSONResponse(_StarletteJSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# mkstemp creates 0600 files; the JSON files are read by consumers running as
+# another uid, so they get the usual open() mode (0666 & ~umask, 0644 by default)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_FILE_MODE = 0o666 & ~_UMASK
+
+
+def write_json(path: Union[str, Path], obj: Any) -> Path:
+    """Serialize `obj` to `path` atomically (same directory temp file + os.replace)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        os.fchmod(fd, _FILE_MODE)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(dumps(obj))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return path
@@ -0,0 +1,51 @@
+// Typeahead for search inputs (GET /autocomplete, see app/routers/autocomplete.py).
+//
+// Markup:
+//   <input name="q" data-autocomplete="serial,po">   kinds to suggest
+// Suggestions go in a <datalist>; picking one fills the input, which the live
+// search (fragments.js) then applies like any typed value.
+(function () {
+  "use strict";
+  var DEBOUNCE_MS = 120;
+  var MIN_CHARS = 2;
+
+  document.querySelectorAll("input[data-autocomplete]").forEach(function (input, n) {
+    var list = document.createElement("datalist");
+    list.id = "autocomplete-" + n;
+    input.after(list);
+    input.setAttribute("list", list.id);
+    input.setAttribute("autocomplete", "off");
+
+    var controller = null;
+    var timer = null;
+    var asked = "";
+
+    function render(results) {
+      list.replaceChildren.apply(list, results.map(function (r) {
+        var opt = document.createElement("option");
+        opt.value = r.value;
+        opt.label = r.kind + " · " + r.source;
+        return opt;
+      }));
+    }
+
+    function ask() {
+      var q = input.value.trim();
+      if (q === asked) return;
+      asked = q;
+      if (controller) controller.abort();
+      if (q.length < MIN_CHARS) { render([]); return; }
+      controller = new AbortController();
+      var params = new URLSearchParams({q: q, types: input.dataset.autocomplete, limit: "10"});
+      fetch("/autocomplete?" + params.toString(), {signal: controller.signal, credentials: "same-origin"})
+        .then(function (r) { return r.ok ? r.json() : {results: []}; })
+        .then(function (data) { if (data.q === input.value.trim()) render(data.results); })
+        .catch(function () {});
+    }
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(ask, DEBOUNCE_MS);
+    });
+  });
+})();
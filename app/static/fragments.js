@@ -0,0 +1,102 @@
+// In-place pagination, sorting and live search for the list pages.
+//
+// Markup (see e.g. templates/assets.html):
+//   <form data-live-search>            toolbar; text inputs search as you type
+//   <div data-fragment="/x/fragment">  replaced by the fragment of the new URL
+//   <a data-sync-query="format">       export links follow the current filters
+//                                      (listed params of the link are kept)
+// Without JavaScript the same links and forms reload the full page.
+(function () {
+  "use strict";
+  var box = document.querySelector("[data-fragment]");
+  if (!box) return;
+  var form = document.querySelector("form[data-live-search]");
+  var pagePath = location.pathname;
+  var DEBOUNCE_MS = 250;
+  var controller = null;
+  var timer = null;
+
+  function syncLinks(params) {
+    document.querySelectorAll("a[data-sync-query]").forEach(function (a) {
+      var url = new URL(a.href, location.origin);
+      var keep = new Set(a.dataset.syncQuery.split(",").filter(Boolean));
+      var next = new URLSearchParams();
+      url.searchParams.forEach(function (v, k) { if (keep.has(k)) next.set(k, v); });
+      params.forEach(function (v, k) { if (k !== "page" && k !== "per_page" && !keep.has(k)) next.set(k, v); });
+      a.href = url.pathname + "?" + next.toString();
+    });
+  }
+
+  // history: "push" (navigation), "replace" (typing), "none" (back/forward)
+  function load(params, history) {
+    var qs = params.toString();
+    var pageUrl = pagePath + (qs ? "?" + qs : "");
+    if (controller) controller.abort();
+    controller = new AbortController();
+    box.setAttribute("aria-busy", "true");
+    fetch(box.dataset.fragment + (qs ? "?" + qs : ""), {signal: controller.signal, credentials: "same-origin"})
+      .then(function (r) {
+        if (!r.ok) throw new Error(r.status);
+        return r.text();
+      })
+      .then(function (html) {
+        box.innerHTML = html;
+        if (history === "push") window.history.pushState(null, "", pageUrl);
+        else if (history === "replace") window.history.replaceState(null, "", pageUrl);
+        syncLinks(params);
+        box.removeAttribute("aria-busy");
+      })
+      .catch(function (err) {
+        if (err.name === "AbortError") return;
+        location.href = pageUrl;  // fall back to the full page
+      });
+  }
+
+  function formParams() {
+    // current URL (sort, facet filters…) overridden by the visible form fields
+    var params = new URLSearchParams(location.search);
+    form.querySelectorAll("input[type=text], input[type=search], input:not([type]), select").forEach(function (el) {
+      if (!el.name) return;
+      if (el.value) params.set(el.name, el.value);
+      else params.delete(el.name);
+    });
+    params.delete("page");
+    return params;
+  }
+
+  document.addEventListener("click", function (e) {
+    var a = e.target.closest("a[href]");
+    if (!a || !box.contains(a) || e.defaultPrevented || e.button !== 0 || e.ctrlKey || e.metaKey || e.shiftKey) return;
+    var url = new URL(a.href, location.origin);
+    if (url.origin !== location.origin || url.pathname !== pagePath) return;
+    e.preventDefault();
+    load(url.searchParams, "push");
+  });
+
+  if (form) {
+    form.querySelectorAll("select[onchange]").forEach(function (s) { s.onchange = null; });
+    form.addEventListener("input", function (e) {
+      if (e.target.tagName !== "INPUT") return;
+      clearTimeout(timer);
+      timer = setTimeout(function () { load(formParams(), "replace"); }, DEBOUNCE_MS);
+    });
+    form.addEventListener("change", function (e) {
+      if (e.target.tagName === "SELECT") load(formParams(), "push");
+    });
+    form.addEventListener("submit", function (e) {
+      e.preventDefault();
+      clearTimeout(timer);
+      load(formParams(), "push");
+    });
+  }
+
+  window.addEventListener("popstate", function () {
+    var params = new URLSearchParams(location.search);
+    if (form) {
+      form.querySelectorAll("input[type=text], input[type=search], input:not([type]), select").forEach(function (el) {
+        if (el.name && el.type !== "hidden") el.value = params.get(el.name) || (el.tagName === "SELECT" ? el.value : "");
+      });
+    }
+    load(params, "none");
+  });
+})();
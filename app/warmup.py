@@ -0,0 +1,117 @@
+# app/warmup.py
+"""
+Startup warmup and readiness state (GET /readyz, app/routers/health.py).
+
+Each worker runs its warmup steps in parallel threads from the app lifespan
+(app/main.py) before it accepts traffic, for at most STARTUP_WARMUP_TIMEOUT_S
+seconds: the first users after a rollout then no longer pay for template
+compilation, the first DB connections and reference loads.
+
+- a required step gates readiness: /readyz answers 503 until it succeeded
+- a step still running at the timeout keeps running; the worker starts
+  serving and turns ready when it completes
+- a failed required step is retried by the next /readyz (e.g. the DB was
+  down at startup), so the pod recovers without a restart
+- optional steps (cache prewarming) never block startup nor readiness
+
+Durations are exported as app_warmup_duration_seconds{step}; step="total" is
+the time the lifespan waited before serving.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger("app.warmup")
+
+STARTUP_WARMUP_TIMEOUT_S = float(os.getenv("STARTUP_WARMUP_TIMEOUT_S", "30"))
+
+WARMUP_DURATION = Gauge("app_warmup_duration_seconds", "Startup warmup duration by step (total = lifespan wait)",
+                        ["step"], multiprocess_mode="liveall")
+WARMUP_FAILURES = Counter("app_warmup_failures_total", "Failed warmup steps (startup or /readyz retry)", ["step"])
+
+
+class _Step:
+    __slots__ = ("name", "fn", "required", "status", "error")
+
+    def __init__(self, name: str, fn: Callable[[], None], required: bool):
+        self.name = name
+        self.fn = fn
+        self.required = required
+        self.status = "pending"  # pending | running | ok | failed
+        self.error: Optional[str] = None
+
+
+_steps: Dict[str, _Step] = {}
+_lock = threading.Lock()
+
+
+def step(name: str, fn: Callable[[], None], required: bool = True) -> None:
+    """Register a warmup step (before the lifespan runs)."""
+    _steps[name] = _Step(name, fn, required)
+
+
+def _run_step(s: _Step) -> None:
+    with _lock:
+        if s.status in ("running", "ok"):
+            return
+        s.status = "running"
+    start = time.perf_counter()
+    try:
+        s.fn()
+    except Exception as e:
+        WARMUP_FAILURES.labels(s.name).inc()
+        logger.warning("warmup step %s failed: %s", s.name, e)
+        s.status, s.error = "failed", str(e)
+    else:
+        s.status, s.error = "ok", None
+    finally:
+        WARMUP_DURATION.labels(s.name).set(time.perf_counter() - start)
+
+
+async def run(timeout: float = STARTUP_WARMUP_TIMEOUT_S) -> None:
+    """Start every step in a thread; return when the required ones are done or after `timeout`."""
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    required = []
+    for s in _steps.values():
+        fut = loop.run_in_executor(None, _run_step, s)
+        if s.required:
+            required.append(fut)
+    if required:
+        _, pending = await asyncio.wait(required, timeout=timeout)
+        if pending:
+            logger.warning("warmup not finished after %gs (%s): serving, /readyz stays 503 until it is", timeout,
+                           ", ".join(s.name for s in _steps.values() if s.required and s.status == "running"))
+    elapsed = time.perf_counter() - start
+    WARMUP_DURATION.labels("total").set(elapsed)
+    logger.info("warmup done in %.2fs: %s", elapsed, ", ".join(f"{s.name}={s.status}" for s in _steps.values()))
+
+
+def readiness(retry: bool = True) -> Dict[str, Dict[str, Optional[str]]]:
+    """{step: {status, error}} of the required steps, re-running the failed ones first."""
+    out = {}
+    for s in _steps.values():
+        if not s.required:
+            continue
+        if retry and s.status == "failed":
+            _run_step(s)
+        out[s.name] = {"status": s.status, "error": s.error}
+    return out
+
+
+def optional_status() -> Dict[str, str]:
+    return {s.name: s.status for s in _steps.values() if not s.required}
+
+
+# ---------- generic steps ----------
+def compile_templates(envs: List) -> None:
+    """Compile (and cache) every template of each Jinja2Templates instance."""
+    for templates in envs:
+        env = templates.env
+        for name in env.list_templates(extensions=("html",)):
+            env.get_template(name)
@@ -0,0 +1,99 @@
+"""
+JSON serialization micro-benchmark on a 100k-asset payload (no DB needed).
+
+    python bench/json_serialize.py [--rows 100000] [--repeat 5]
+
+Rows mimic the asset list / export: psycopg2 types included (datetime,
+Decimal, None). Compares, best of --repeat runs, the serialize time and the
+output size of:
+- stdlib json, indent=2 (what the JSON files used to be written with)
+- stdlib json, compact, with a default= hook for datetime/Decimal
+- FastAPI's default path (jsonable_encoder + json.dumps), when fastapi is installed
+- app.serialization.dumps (orjson)
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.serialization import _default, dumps, orjson  # noqa: E402
+
+EPOCH = datetime(2024, 1, 1)
+
+
+def payload(rows: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "serial_number": f"SN{i:08d}",
+            "model": ("R750", "R650", "DL380 Gen10", "SR650")[i % 4],
+            "vendor": ("dell", "hpe", "lenovo")[i % 3],
+            "region": f"region-{i % 7}",
+            "processor_type": "Intel Xeon Gold 6338",
+            "number_core": 32 + (i % 4) * 8,
+            "memory_gb": Decimal("512.00") if i % 2 else Decimal("768.50"),
+            "price": Decimal(f"{4000 + i % 900}.{i % 100:02d}"),
+            "bmc_mac": f"aa:bb:cc:{(i >> 16) & 255:02x}:{(i >> 8) & 255:02x}:{i & 255:02x}",
+            "comments": None if i % 5 else "réception partielle",
+            "received_at": EPOCH + timedelta(minutes=i),
+            "updated_at": EPOCH + timedelta(minutes=i, seconds=30, microseconds=i % 1000),
+        }
+        for i in range(rows)
+    ]
+
+
+def _stdlib_indent(obj: Any) -> bytes:
+    return json.dumps(obj, default=_default, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _stdlib_compact(obj: Any) -> bytes:
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _candidates() -> Dict[str, Callable[[Any], bytes]]:
+    c: Dict[str, Callable[[Any], bytes]] = {
+        "stdlib indent=2": _stdlib_indent,
+        "stdlib compact": _stdlib_compact,
+    }
+    try:
+        from fastapi.encoders import jsonable_encoder
+
+        # what starlette's JSONResponse.render does after FastAPI encodes the return value
+        c["fastapi default"] = lambda obj: json.dumps(
+            jsonable_encoder(obj), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+    except ImportError:
+        print("(fastapi not installed: jsonable_encoder path skipped)")
+    c["app.serialization" + (" (orjson)" if orjson else " (stdlib fallback)")] = dumps
+    return c
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    data = payload(args.rows)
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"{'encoder':<34} {'ms':>9} {'MB':>8} {'x faster':>9}")
+    base = None
+    for name, fn in _candidates().items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            out = fn(data)
+            best = min(best, time.perf_counter() - t0)
+        base = base or best
+        print(f"{name:<34} {best * 1000:9.1f} {len(out) / 1e6:8.2f} {base / best:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
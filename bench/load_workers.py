@@ -0,0 +1,97 @@
+"""
+Load test: requests/sec of the gunicorn profile with 1..N workers.
+
+Starts `gunicorn -c gunicorn.conf.py app.main:app` once per worker count,
+hammers one URL with a pool of keep-alive client threads and prints req/s
+and latency percentiles, e.g.:
+
+    python bench/load_workers.py --workers 1 2 4 --path /sites --seconds 15
+
+The app needs its usual DB_* env vars for DB-backed paths; "/" only renders a template.
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _wait_ready(port: int, path: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            c = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            c.request("GET", path)
+            c.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.3)
+    raise RuntimeError("server did not start")
+
+
+def _client(port: int, path: str, stop_at: float, lat: list, errors: list) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    while time.time() < stop_at:
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status >= 500:
+                errors.append(resp.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            continue
+        lat.append(time.perf_counter() - t0)
+
+
+def run(workers: int, port: int, path: str, clients: int, seconds: float) -> None:
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{port}", ACCESS_LOG="")
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(port, path)
+        lat: list = []
+        errors: list = []
+        stop_at = time.time() + seconds
+        threads = [threading.Thread(target=_client, args=(port, path, stop_at, lat, errors)) for _ in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        lat.sort()
+        pct = lambda p: lat[min(len(lat) - 1, int(len(lat) * p))] * 1000 if lat else float("nan")
+        print(
+            f"workers={workers:<3} req/s={len(lat) / seconds:9.1f}  "
+            f"p50={statistics.median(lat) * 1000 if lat else float('nan'):7.2f} ms  "
+            f"p95={pct(0.95):7.2f} ms  p99={pct(0.99):7.2f} ms  errors={len(errors)}"
+        )
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--path", default="/")
+    ap.add_argument("--clients", type=int, default=64)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--port", type=int, default=18010)
+    args = ap.parse_args()
+    for w in args.workers:
+        run(w, args.port, args.path, args.clients, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Row representation memory benchmark on 100k rows (no DB needed).
+
+    python bench/row_memory.py [--rows 100000] [--columns 45]
+
+Rows mimic a `SELECT * FROM t_poolservers` page as psycopg2 returns it
+(tuples of int/str/bool/datetime/None). For each representation the table
+gives the memory it adds on top of the fetched tuples (tracemalloc), the
+build time and the time to read every cell by attribute/key, as a template
+does:
+- dict(zip(cols, r)) per row (what the list pages used to build)
+- app.db.rows.records() (one namedtuple class per query shape)
+- the fetched tuples themselves (baseline: nothing added)
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.db.rows import records  # noqa: E402
+
+EPOCH = datetime(2024, 1, 1)
+
+
+def fetched(rows: int, columns: int) -> Tuple[List[str], List[tuple]]:
+    cols = ["t_poolservers_id"] + [f"t_poolservers_col_{j:02d}" for j in range(1, columns)]
+    kinds = (
+        lambda i, j: f"value-{(i * 31 + j) % 5000}",
+        lambda i, j: bool((i + j) % 2),
+        lambda i, j: EPOCH + timedelta(minutes=i + j),
+        lambda i, j: (i * j) % 10_000,
+        lambda i, j: None,
+    )
+    data = [tuple([i] + [kinds[j % len(kinds)](i, j) for j in range(1, columns)]) for i in range(rows)]
+    return cols, data
+
+
+def _as_dicts(cols: Sequence[str], rows: List[tuple]) -> List[Dict[str, Any]]:
+    return [dict(zip(cols, r)) for r in rows]
+
+
+def _read_dicts(cols: Sequence[str], rows: List[Dict[str, Any]]) -> None:
+    for r in rows:
+        for c in cols:
+            r[c]
+
+
+def _read_records(cols: Sequence[str], rows: List[Any]) -> None:
+    for r in rows:
+        for c in cols:
+            getattr(r, c)
+
+
+def _read_tuples(cols: Sequence[str], rows: List[tuple]) -> None:
+    n = len(cols)
+    for r in rows:
+        for i in range(n):
+            r[i]
+
+
+def _measure(build: Callable[[], Any]) -> Tuple[Any, int, float]:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = build()
+    elapsed = time.perf_counter() - t0
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, size, elapsed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--columns", type=int, default=45)
+    args = ap.parse_args()
+
+    cols, data = fetched(args.rows, args.columns)
+    candidates = [
+        ("dict per row", lambda: _as_dicts(cols, data), _read_dicts),
+        ("app.db.rows.records", lambda: records(cols, data), _read_records),
+        ("fetched tuples (baseline)", lambda: list(data), _read_tuples),
+    ]
+
+    print(f"{args.rows} rows x {args.columns} columns (build/read timed without tracemalloc)")
+    print(f"{'representation':<28} {'MB added':>9} {'B/row':>7} {'build ms':>9} {'read ms':>8}")
+    for name, build, read in candidates:
+        out, size, _ = _measure(build)
+        del out
+        gc.collect()
+        t0 = time.perf_counter()
+        out = build()
+        built = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        read(cols, out)
+        read_s = time.perf_counter() - t0
+        del out
+        print(f"{name:<28} {size / 1e6:9.1f} {size // args.rows:7d} {built * 1000:9.1f} {read_s * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
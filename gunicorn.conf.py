@@ -0,0 +1,81 @@
+# gunicorn.conf.py — production serving profile (used by the Dockerfile CMD)
+#
+#   gunicorn -c gunicorn.conf.py app.main:app
+#
+# Every knob can be overridden by env var; defaults suit the OpenShift pod.
+import math
+import os
+from pathlib import Path
+
+
+def _cpu_quota() -> float | None:
+    """CPUs granted by the container CPU limit (cgroup v2, then v1); None if unlimited."""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+# without a CPU limit the host CPU count is no sizing hint (32+ on a node): every
+# worker opens its own DB connections, so a rollout could exhaust max_connections
+UNLIMITED_CPU_MAX_WORKERS = int(os.getenv("UNLIMITED_CPU_MAX_WORKERS", "4"))
+
+
+def _default_workers() -> int:
+    # async workers: one per CPU of the quota is enough (the sync handlers run
+    # in each worker's threadpool); never more than the host CPUs
+    quota = _cpu_quota()
+    if quota is None:
+        return max(1, min(os.cpu_count() or 1, UNLIMITED_CPU_MAX_WORKERS))
+    cpus = min(quota, os.cpu_count() or quota)
+    return max(1, math.ceil(cpus))
+
+
+bind = os.getenv("BIND", f":{os.getenv('PORT', '8010')}")
+workers = int(os.getenv("WEB_CONCURRENCY", _default_workers()))
+worker_class = os.getenv("WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+
+# import the app once in the master, workers fork with shared (copy-on-write) memory
+preload_app = os.getenv("PRELOAD_APP", "1") == "1"
+
+# recycle workers to bound memory growth; jitter avoids all restarting together
+max_requests = int(os.getenv("MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "500"))
+
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+# behind the OpenShift router: keep idle upstream connections a bit longer than its 30s
+keepalive = int(os.getenv("KEEPALIVE", "35"))
+backlog = int(os.getenv("BACKLOG", "2048"))
+
+accesslog = os.getenv("ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+# Prometheus multi-process mode: each worker writes its samples here and
+# /metrics aggregates them (see app/routers/metrics.py)
+_prom_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if _prom_dir:
+    # prometheus_client fails at import when the directory is missing, even with one worker
+    Path(_prom_dir).mkdir(parents=True, exist_ok=True)
+    if workers > 1:
+        for _f in Path(_prom_dir).glob("*.db"):
+            _f.unlink()
+
+
+def child_exit(server, worker):
+    if _prom_dir:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,5 +1,12 @@
 from app.main import app
 
 if __name__ == "__main__":
+    # local development only; production runs gunicorn -c gunicorn.conf.py
+    import os
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        reload=os.getenv("RELOAD", "1") == "1",
+    )
@@ -0,0 +1,29 @@
+-- /assets/upload: content-addressed dedupe and row-level diff.
+--
+--   t_asset_upload       one row per distinct CSV received (sha256 of the bytes);
+--                        the last file sent again is answered from here
+--   t_asset_fingerprint  last fingerprint sent downstream per SerialNumber;
+--                        only new or changed rows go to assets_transformed.json
+--
+-- Re-send everything for a serial: DELETE its fingerprint row (or tick
+-- "Tout renvoyer" on the upload page).
+CREATE TABLE IF NOT EXISTS supchain.t_asset_upload (
+    sha256        text PRIMARY KEY,
+    filename      text,
+    rows_total    integer NOT NULL,
+    rows_added    integer NOT NULL,
+    rows_changed  integer NOT NULL,
+    rows_unchanged integer NOT NULL,
+    uploaded_at   timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS supchain.t_asset_fingerprint (
+    serial_number text PRIMARY KEY,
+    fingerprint   bytea NOT NULL,
+    upload_sha256 text,
+    updated_at    timestamptz NOT NULL DEFAULT now()
+);
+
+-- "is this the last file imported" (re-importing a file bumps uploaded_at)
+CREATE INDEX IF NOT EXISTS ix_asset_upload_uploaded_at
+    ON supchain.t_asset_upload (uploaded_at DESC);
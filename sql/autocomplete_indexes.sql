@@ -0,0 +1,39 @@
+-- Typeahead (GET /autocomplete?q=...): prefix lookups on serials, MKP
+-- hostnames and PO numbers.
+--
+-- The list pages search with ILIKE '%x%', which no btree can serve. The
+-- autocomplete only matches prefixes, case-insensitively:
+--     lower(col) LIKE 'abc%'  ORDER BY lower(col) USING ~<~  LIMIT n
+-- A btree on lower(col) with text_pattern_ops serves the LIKE prefix whatever
+-- the database collation, and returns rows in ~<~ (byte) order: the ORDER BY
+-- must say USING ~<~, a plain ORDER BY lower(col) would add a Sort over every
+-- matching row. The router MUST use the exact same lower(col) expression
+-- (bench/autocomplete.py --explain checks the plans).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_asset_report_serial_prefix
+    ON supchain.t_asset_report (lower(t_asset_report_serial_number) text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_asset_report_po_prefix
+    ON supchain.t_asset_report (lower(t_asset_report_po_number) text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_poolservers_serial_prefix
+    ON supchain.t_poolservers (lower(t_poolservers_serial_number) text_pattern_ops);
+
+-- partial: most pool servers have no MKP hostname yet
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_poolservers_mkp_hostname_prefix
+    ON supchain.t_poolservers (lower(t_poolservers_mkp_hostname) text_pattern_ops)
+    WHERE t_poolservers_mkp_hostname IS NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_server_sts_serial_prefix
+    ON supchain.t_server_sts (lower(t_server_sts_serial) text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_server_sts_po_prefix
+    ON supchain.t_server_sts (lower(t_server_sts_po_number) text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_order_servers_po_prefix
+    ON supchain.t_order_servers (lower(t_order_servers_po_number) text_pattern_ops);
+
+ANALYZE supchain.t_asset_report;
+ANALYZE supchain.t_poolservers;
+ANALYZE supchain.t_server_sts;
+ANALYZE supchain.t_order_servers;
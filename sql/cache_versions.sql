@@ -0,0 +1,100 @@
+-- Data versions for the in-process caches (app/cache.py).
+-- Every transaction touching a watched table bumps its row here; the app
+-- reads one version (PK lookup) per request and recomputes only when it
+-- changed. The bump is also sent as NOTIFY cache_version, '<name>' so
+-- in-memory snapshots (reference tables) reload right away without polling.
+--
+-- The bump is deferred to commit: the statement trigger only records the name
+-- in t_cache_version_pending (one row per transaction and name, keys never
+-- shared between transactions), a deferred constraint trigger on it then
+-- updates t_cache_version. The hot version row is locked for the commit only,
+-- not for the whole writer transaction, so concurrent writers of a table no
+-- longer queue behind each other's row lock.
+CREATE TABLE IF NOT EXISTS supchain.t_cache_version (
+    name        text PRIMARY KEY,
+    version     bigint      NOT NULL DEFAULT 0,
+    changed_at  timestamptz NOT NULL DEFAULT now()
+);
+
+-- Both trigger functions run as their owner (the migration role), so the
+-- roles writing the watched tables need no privilege on the version tables.
+
+-- names bumped by transactions still in progress (emptied at their commit)
+CREATE UNLOGGED TABLE IF NOT EXISTS supchain.t_cache_version_pending (
+    name  text   NOT NULL,
+    txid  bigint NOT NULL DEFAULT txid_current(),
+    PRIMARY KEY (name, txid)
+);
+
+CREATE OR REPLACE FUNCTION supchain.f_bump_cache_version() RETURNS trigger
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = supchain, pg_temp AS $$
+BEGIN
+    -- statement level; later statements of the same transaction are no-ops
+    INSERT INTO supchain.t_cache_version_pending (name) VALUES (TG_ARGV[0])
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION supchain.f_commit_cache_version() RETURNS trigger
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = supchain, pg_temp AS $$
+BEGIN
+    INSERT INTO supchain.t_cache_version AS v (name, version, changed_at)
+    VALUES (NEW.name, 1, now())
+    ON CONFLICT (name) DO UPDATE SET version = v.version + 1, changed_at = now();
+    DELETE FROM supchain.t_cache_version_pending WHERE name = NEW.name AND txid = NEW.txid;
+    PERFORM pg_notify('cache_version', NEW.name);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_cache_version_commit ON supchain.t_cache_version_pending;
+CREATE CONSTRAINT TRIGGER trg_cache_version_commit
+    AFTER INSERT ON supchain.t_cache_version_pending
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION supchain.f_commit_cache_version();
+
+DROP TRIGGER IF EXISTS trg_cache_version ON supchain.t_poolservers;
+CREATE TRIGGER trg_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON supchain.t_poolservers
+    FOR EACH STATEMENT EXECUTE FUNCTION supchain.f_bump_cache_version('poolservers');
+
+DROP TRIGGER IF EXISTS trg_cache_version ON supchain.t_site;
+CREATE TRIGGER trg_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON supchain.t_site
+    FOR EACH STATEMENT EXECUTE FUNCTION supchain.f_bump_cache_version('sites');
+
+DROP TRIGGER IF EXISTS trg_cache_version ON supchain.t_ref_set_vlan;
+CREATE TRIGGER trg_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON supchain.t_ref_set_vlan
+    FOR EACH STATEMENT EXECUTE FUNCTION supchain.f_bump_cache_version('vlans');
+
+DROP TRIGGER IF EXISTS trg_cache_version ON supchain.t_catalog_server;
+CREATE TRIGGER trg_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON supchain.t_catalog_server
+    FOR EACH STATEMENT EXECUTE FUNCTION supchain.f_bump_cache_version('catalog');
+
+-- Dell order detail (/orders/{id}/dell): any change in the chain
+DROP TRIGGER IF EXISTS trg_cache_version ON supchain.t_dell_orders;
+CREATE TRIGGER trg_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON supchain.t_dell_orders
+    FOR EACH STATEMENT EXECUTE FUNCTION supchain.f_bump_cache_version('dell_orders');
+
+DROP TRIGGER IF EXISTS trg_cache_version ON supchain.t_product_info;
+CREATE TRIGGER trg_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON supchain.t_product_info
+    FOR EACH STATEMENT EXECUTE FUNCTION supchain.f_bump_cache_version('dell_orders');
+
+DROP TRIGGER IF EXISTS trg_cache_version ON supchain.t_asset_details;
+CREATE TRIGGER trg_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON supchain.t_asset_details
+    FOR EACH STATEMENT EXECUTE FUNCTION supchain.f_bump_cache_version('dell_orders');
+
+DROP TRIGGER IF EXISTS trg_cache_version ON supchain.t_mac_address;
+CREATE TRIGGER trg_cache_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON supchain.t_mac_address
+    FOR EACH STATEMENT EXECUTE FUNCTION supchain.f_bump_cache_version('dell_orders');
+
+INSERT INTO supchain.t_cache_version (name)
+VALUES ('poolservers'), ('sites'), ('vlans'), ('catalog'), ('dell_orders')
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,53 @@
+-- Home page KPIs (GET /)
+--
+-- One small materialized view holding every counter of the dashboard, so the
+-- page reads a few dozen rows whatever the size of the underlying tables:
+--   orders_status   orders by t_order_servers_status
+--   warehouse       servers in warehouse by vendor / physical zone target
+--   pending         T_ServerSts rows waiting for validation
+--   pool_state      pool servers by state string
+--
+-- Refreshed by the app every HOME_KPI_REFRESH_S seconds (one worker at a time,
+-- advisory lock), or by hand / cron with:
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY supchain.mv_home_kpis;
+-- or POST /home/refresh.
+CREATE MATERIALIZED VIEW IF NOT EXISTS supchain.mv_home_kpis AS
+SELECT kpi, label, sublabel, value, now() AS refreshed_at
+FROM (
+    SELECT 'orders_status'::text AS kpi,
+           COALESCE(NULLIF(TRIM(t_order_servers_status), ''), '—') AS label,
+           ''::text AS sublabel,
+           COUNT(*) AS value
+    FROM supchain.t_order_servers
+    GROUP BY 2
+
+    UNION ALL
+
+    SELECT 'warehouse',
+           COALESCE(NULLIF(TRIM(t_server_sts_vendor), ''), '—'),
+           COALESCE(NULLIF(TRIM(t_server_sts_physical_zone_target), ''), '—'),
+           COUNT(*)
+    FROM supchain.t_server_sts
+    -- same predicate as /servers/warehouse
+    WHERE LOWER(TRIM(t_server_sts_state_string)) IN ('warehouse', 'warehousse', 'warehous')
+    GROUP BY 2, 3
+
+    UNION ALL
+
+    SELECT 'pending', '', '', COUNT(*)
+    FROM T_ServerSts
+    WHERE migration_status = 'PendingValidation'
+
+    UNION ALL
+
+    SELECT 'pool_state',
+           COALESCE(NULLIF(TRIM(t_poolservers_state_string), ''), '—'),
+           '',
+           COUNT(*)
+    FROM supchain.t_poolservers
+    GROUP BY 2
+) k;
+
+-- required by REFRESH ... CONCURRENTLY (labels are never NULL, see COALESCE above)
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_home_kpis_row
+    ON supchain.mv_home_kpis (kpi, label, sublabel);
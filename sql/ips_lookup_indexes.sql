@@ -0,0 +1,42 @@
+-- IP / MAC lookup on the DHCP inventory (used by /ips?lookup=...)
+--
+-- t_ref_dhcp_network, t_result_dhcp_ip and t_result_dhcp_mac_address are stored
+-- as text and may contain dirty values, so we index tolerant casts instead of
+-- a plain ::inet / ::macaddr (which would make CREATE INDEX fail on bad rows).
+-- The router queries MUST use the exact same expressions to hit the indexes.
+
+CREATE OR REPLACE FUNCTION supchain.f_inet_or_null(v text)
+RETURNS inet
+LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE AS $$
+BEGIN
+    RETURN NULLIF(TRIM(v), '')::inet;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION supchain.f_macaddr_or_null(v text)
+RETURNS macaddr
+LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE AS $$
+BEGIN
+    RETURN NULLIF(TRIM(v), '')::macaddr;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END $$;
+
+-- "which network contains 10.12.3.44"  ->  network >>= ip
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ref_dhcp_network_inet
+    ON supchain.t_ref_dhcp
+    USING gist (supchain.f_inet_or_null(t_ref_dhcp_network) inet_ops);
+
+-- "who holds 10.12.3.44"  ->  exact lease lookup (also serves <<= range scans)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_result_dhcp_ip_inet
+    ON supchain.t_result_dhcp
+    USING gist (supchain.f_inet_or_null(t_result_dhcp_ip) inet_ops);
+
+-- "where is this MAC"  ->  normalised equality, any input notation
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_result_dhcp_mac_norm
+    ON supchain.t_result_dhcp
+    USING btree (supchain.f_macaddr_or_null(t_result_dhcp_mac_address));
+
+ANALYZE supchain.t_ref_dhcp;
+ANALYZE supchain.t_result_dhcp;
@@ -0,0 +1,80 @@
+-- Global MAC lookup (used by /macs/...)
+--
+-- One row per (source, source row, MAC) across:
+--   order    : supchain.t_mac_address (Dell order detail, via asset -> product -> dell order)
+--   asset    : supchain.t_asset_report BMC MAC + every value of the NIC JSON
+--   lease    : supchain.t_result_dhcp
+-- MACs are normalised with supchain.f_macaddr_or_null (sql/ips_lookup_indexes.sql).
+--
+-- Refresh after ingestion (or from cron) with:
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY supchain.mv_mac_lookup;
+-- or POST /macs/refresh.
+
+CREATE OR REPLACE FUNCTION supchain.f_jsonb_or_null(v text)
+RETURNS jsonb
+LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE AS $$
+BEGIN
+    RETURN NULLIF(TRIM(v), '')::jsonb;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END $$;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS supchain.mv_mac_lookup AS
+SELECT DISTINCT ON (source, source_id, mac) *
+FROM (
+    SELECT
+        supchain.f_macaddr_or_null(ma.mac_address)  AS mac,
+        'order'::text                               AS source,
+        ma.id                                       AS source_id,
+        ad.service_tag                              AS serial,
+        d.purchase_order_id                         AS order_id,
+        NULL::int                                   AS asset_report_id,
+        NULL::int                                   AS ref_dhcp_id,
+        ma.mac_type                                 AS detail
+    FROM supchain.t_mac_address ma
+    LEFT JOIN supchain.t_asset_details ad ON ad.id = ma.asset_details_id
+    LEFT JOIN supchain.t_product_info p   ON p.id = ad.product_info_id
+    LEFT JOIN supchain.t_dell_orders d    ON d.id = p.dell_order_id
+
+    UNION ALL
+
+    SELECT
+        supchain.f_macaddr_or_null(a.t_asset_report_bmc_mac_address),
+        'asset', a.t_asset_report_id, a.t_asset_report_serial_number,
+        NULL, a.t_asset_report_id, NULL, 'bmc'
+    FROM supchain.t_asset_report a
+
+    UNION ALL
+
+    SELECT
+        supchain.f_macaddr_or_null(nic.value),
+        'asset', a.t_asset_report_id, a.t_asset_report_serial_number,
+        NULL, a.t_asset_report_id, NULL, nic.key
+    FROM supchain.t_asset_report a
+    CROSS JOIN LATERAL jsonb_each_text(
+        CASE jsonb_typeof(supchain.f_jsonb_or_null(a.t_asset_report_list_mac_nic_json_format::text))
+            WHEN 'object' THEN supchain.f_jsonb_or_null(a.t_asset_report_list_mac_nic_json_format::text)
+            ELSE '{}'::jsonb
+        END
+    ) AS nic
+
+    UNION ALL
+
+    SELECT
+        supchain.f_macaddr_or_null(r.t_result_dhcp_mac_address),
+        'lease', r.t_result_dhcp_id, r.t_result_dhcp_host_a,
+        NULL, NULL, r.t_result_dhcp_id_ref_dhcp, r.t_result_dhcp_ip
+    FROM supchain.t_result_dhcp r
+) src
+WHERE mac IS NOT NULL
+ORDER BY source, source_id, mac, detail;
+
+-- required by REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_mac_lookup_row
+    ON supchain.mv_mac_lookup (source, source_id, mac);
+
+-- the lookup path: mac = $1 / mac = ANY($1)
+CREATE INDEX IF NOT EXISTS ix_mv_mac_lookup_mac
+    ON supchain.mv_mac_lookup (mac);
+
+ANALYZE supchain.mv_mac_lookup;
@@ -0,0 +1,9 @@
+-- /orders "Statut Dell" column: latest t_dell_orders row per order, fetched with
+--   LEFT JOIN LATERAL (... WHERE d.purchase_order_id = o.id
+--                      ORDER BY d.status_datetime DESC NULLS LAST LIMIT 1)
+-- One index probe per listed order; INCLUDE makes it index-only.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_dell_orders_po_status_dt
+    ON supchain.t_dell_orders (purchase_order_id, status_datetime DESC NULLS LAST)
+    INCLUDE (order_status);
+
+ANALYZE supchain.t_dell_orders;
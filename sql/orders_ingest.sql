@@ -0,0 +1,8 @@
+-- POST /orders/bulk: idempotent bulk ingestion into t_order_servers.
+-- A line re-sent with the same key (client retry, replayed batch) maps to the
+-- row created the first time instead of a duplicate order. NULL = no key.
+ALTER TABLE supchain.t_order_servers
+    ADD COLUMN IF NOT EXISTS t_order_servers_idempotency_key text;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_order_servers_idempotency_key
+    ON supchain.t_order_servers (t_order_servers_idempotency_key);
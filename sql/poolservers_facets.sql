@@ -0,0 +1,24 @@
+-- /pool_servers facet filters (region / zone / status flags).
+-- Partial indexes on the flags ordered like the page (t_poolservers_id), so
+-- "qualif = true" walks only qualified servers in page order.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_poolservers_region_zone
+    ON supchain.t_poolservers (t_poolservers_region, t_poolservers_physical_zone_target, t_poolservers_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_poolservers_heartbeat
+    ON supchain.t_poolservers (t_poolservers_id) WHERE t_poolservers_heartbeat;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_poolservers_san
+    ON supchain.t_poolservers (t_poolservers_id) WHERE t_poolservers_san;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_poolservers_bmc
+    ON supchain.t_poolservers (t_poolservers_id) WHERE t_poolservers_bmc;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_poolservers_discovering
+    ON supchain.t_poolservers (t_poolservers_id) WHERE t_poolservers_discovering;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_poolservers_mynet
+    ON supchain.t_poolservers (t_poolservers_id) WHERE t_poolservers_mynet;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_poolservers_qualif
+    ON supchain.t_poolservers (t_poolservers_id) WHERE t_poolservers_qualif;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_poolservers_maintenance
+    ON supchain.t_poolservers (t_poolservers_id) WHERE t_poolservers_maintenance;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_poolservers_mkp_allocated
+    ON supchain.t_poolservers (t_poolservers_id) WHERE t_poolservers_mkp_server_allocated;
+
+ANALYZE supchain.t_poolservers;
@@ -0,0 +1,260 @@
+-- Local copy of the production schema the routers depend on.
+--
+-- Used by bench/seed.py to build a reproducible benchmark database; column
+-- names and types follow what the routers/templates read. Production remains
+-- the reference: keep this file in sync when a router starts using a new column.
+
+CREATE SCHEMA IF NOT EXISTS supchain;
+
+-- t_poolservers and T_ServerSts are queried without schema prefix
+DO $$ BEGIN
+    EXECUTE format('ALTER DATABASE %I SET search_path = supchain, public', current_database());
+END $$;
+SET search_path = supchain, public;
+
+-- ---------- orders (/orders, /orders/{id}/dell)
+CREATE TABLE IF NOT EXISTS supchain.t_order_servers (
+    t_order_servers_id                 serial PRIMARY KEY,
+    t_order_servers_po_number          text,
+    t_order_servers_project_name       text,
+    t_order_servers_date_add           timestamp DEFAULT now(),
+    t_order_servers_business_unit      text,
+    t_order_servers_vendor             text,
+    t_order_servers_status             text,
+    t_order_servers_ap_code_authorized text
+);
+
+CREATE TABLE IF NOT EXISTS supchain.t_dell_orders (
+    id                serial PRIMARY KEY,
+    purchase_order_id integer REFERENCES supchain.t_order_servers (t_order_servers_id),
+    order_number      text,
+    order_date        date,
+    quote_number      text,
+    order_status      text,
+    status_datetime   timestamp
+);
+CREATE INDEX IF NOT EXISTS ix_dell_orders_po ON supchain.t_dell_orders (purchase_order_id);
+
+CREATE TABLE IF NOT EXISTS supchain.t_product_info (
+    id               serial PRIMARY KEY,
+    dell_order_id    integer REFERENCES supchain.t_dell_orders (id),
+    sku_number       text,
+    description      text,
+    item_quantity    integer,
+    line_of_business text
+);
+CREATE INDEX IF NOT EXISTS ix_product_info_order ON supchain.t_product_info (dell_order_id);
+
+CREATE TABLE IF NOT EXISTS supchain.t_asset_details (
+    id              serial PRIMARY KEY,
+    product_info_id integer REFERENCES supchain.t_product_info (id),
+    service_tag     text,
+    asset_tag       text
+);
+CREATE INDEX IF NOT EXISTS ix_asset_details_product ON supchain.t_asset_details (product_info_id);
+
+CREATE TABLE IF NOT EXISTS supchain.t_mac_address (
+    id               serial PRIMARY KEY,
+    asset_details_id integer REFERENCES supchain.t_asset_details (id),
+    mac_address      text,
+    mac_type         text
+);
+CREATE INDEX IF NOT EXISTS ix_mac_address_asset ON supchain.t_mac_address (asset_details_id);
+
+-- ---------- assets (/assets)
+CREATE TABLE IF NOT EXISTS supchain.t_asset_report (
+    t_asset_report_id                       serial PRIMARY KEY,
+    t_asset_report_date_add                 timestamp DEFAULT now(),
+    t_asset_report_serial_number            text,
+    t_asset_report_cfi_code                 text,
+    t_asset_report_region                   text,
+    t_asset_report_cfi_name                 text,
+    t_asset_report_customer_number          text,
+    t_asset_report_customer_name            text,
+    t_asset_report_processor_type           text,
+    t_asset_report_number_socket            integer,
+    t_asset_report_number_core              integer,
+    t_asset_report_model                    text,
+    t_asset_report_customer_address         text,
+    t_asset_report_postcode                 text,
+    t_asset_report_country                  text,
+    t_asset_report_order_number             text,
+    t_asset_report_po_number                text,
+    t_asset_report_bmc_mac_address          text,
+    t_asset_report_memory                   text,
+    t_asset_report_hba                      text,
+    t_asset_report_boss                     text,
+    t_asset_report_perc                     text,
+    t_asset_report_nvme                     text,
+    t_asset_report_gpu                      text,
+    t_asset_report_list_hdd_json_format     text,
+    t_asset_report_list_mac_nic_json_format text
+);
+
+-- ---------- pool (/pool_servers)
+CREATE TABLE IF NOT EXISTS supchain.t_poolservers (
+    t_poolservers_id                           serial PRIMARY KEY,
+    t_poolservers_equipment_name               text,
+    t_poolservers_serial_number                text,
+    t_poolservers_serial_chassis               text,
+    t_poolservers_date_add                     timestamp,
+    t_poolservers_t_catalog_server_id          integer,
+    t_poolservers_t_asset_report_id            integer,
+    t_poolservers_region                       text,
+    t_poolservers_t_site_id                    integer,
+    t_poolservers_priority                     integer,
+    t_poolservers_cfi_code                     text,
+    t_poolservers_physical_zone_target         text,
+    t_poolservers_nic_count                    integer,
+    t_poolservers_heartbeat                    boolean,
+    t_poolservers_san                          boolean,
+    t_poolservers_bmc                          boolean,
+    t_poolservers_bmc_last_check_inc           text,
+    t_poolservers_bmc_date                     timestamp,
+    t_poolservers_bmc_mac                      text,
+    t_poolservers_discovering                  boolean,
+    t_poolservers_discovering_state            text,
+    t_poolservers_discovering_date             timestamp,
+    t_poolservers_discovering_inc              text,
+    t_poolservers_mynet                        boolean,
+    t_poolservers_mynet_state                  text,
+    t_poolservers_mynet_date                   timestamp,
+    t_poolservers_mynet_inc                    text,
+    t_poolservers_qualif                       boolean,
+    t_poolservers_qualif_state                 text,
+    t_poolservers_qualif_date                  timestamp,
+    t_poolservers_t_qualif_id                  integer,
+    t_poolservers_business_unit                text,
+    t_poolservers_ap_code_authorized           text,
+    t_poolservers_maintenance                  boolean,
+    t_poolservers_maintenance_comments         text,
+    t_poolservers_maintenance_date             timestamp,
+    t_poolservers_mkp_subscription_id          text,
+    t_poolservers_mkp_owner                    text,
+    t_poolservers_mkp_track_id                 text,
+    t_poolservers_mkp_server_allocated         boolean,
+    t_poolservers_mkp_allocation_date          timestamp,
+    t_poolservers_mkp_ecosystem                text,
+    t_poolservers_mkp_hostname                 text,
+    t_poolservers_mkp_workspace_id             text,
+    t_poolservers_mkp_deployment_id            text,
+    t_poolservers_mkp_product_name             text,
+    t_poolservers_mkp_product_version          text,
+    t_poolservers_mkp_component_name           text,
+    t_poolservers_mkp_component_version        text,
+    t_poolservers_mkp_product_name_final       text,
+    t_poolservers_mkp_env                      text,
+    t_poolservers_state_int                    integer,
+    t_poolservers_state_string                 text,
+    t_poolservers_supchain_subscription_id     text,
+    t_poolservers_bmaas_subscription_id        text,
+    t_poolservers_soki                         text,
+    t_poolservers_bmc_state                    text,
+    t_poolservers_discovering_last_check_inc   text,
+    t_poolservers_mynet_last_check_inc         text,
+    t_poolservers_mynet_subscription_id        text
+);
+
+-- ---------- DHCP (/ips)
+CREATE TABLE IF NOT EXISTS supchain.t_ref_dhcp (
+    t_ref_dhcp_id           serial PRIMARY KEY,
+    t_ref_dhcp_t_site       integer,
+    t_ref_dhcp_id_lan       integer,
+    t_ref_dhcp_network      text,
+    t_ref_dhcp_add_by       text,
+    t_ref_dhcp_change_by    text,
+    t_ref_dhcp_date_add     timestamp DEFAULT now(),
+    t_ref_dhcp_date_update  timestamp,
+    t_ref_dhcp_infoblox     text,
+    t_ref_dhcp_availability text
+);
+
+CREATE TABLE IF NOT EXISTS supchain.t_result_dhcp (
+    t_result_dhcp_id          serial PRIMARY KEY,
+    t_result_dhcp_id_ref_dhcp integer REFERENCES supchain.t_ref_dhcp (t_ref_dhcp_id),
+    t_result_dhcp_host_a      text,
+    t_result_dhcp_ip          text,
+    t_result_dhcp_mac_address text,
+    t_result_dhcp_date_add    timestamp DEFAULT now(),
+    t_result_dhcp_date_update timestamp
+);
+CREATE INDEX IF NOT EXISTS ix_result_dhcp_ref ON supchain.t_result_dhcp (t_result_dhcp_id_ref_dhcp);
+
+-- ---------- reference data (/sites, /vlans, /catalog)
+CREATE TABLE IF NOT EXISTS supchain.t_site (
+    t_site_id          serial PRIMARY KEY,
+    t_site_address     text,
+    t_site_country     text,
+    t_site_code_postal text,
+    t_site_town        text,
+    t_site_sys_id_itsm text,
+    t_site_contact     text,
+    t_site_region      text,
+    t_site_location    text,
+    t_site_address_cfi text,
+    t_site_datacenter  text
+);
+
+CREATE TABLE IF NOT EXISTS supchain.t_ref_set_vlan (
+    t_ref_set_vlan_id                      serial PRIMARY KEY,
+    t_ref_set_vlan_date_time_added         timestamp DEFAULT now(),
+    t_ref_set_vlan_vlan_target             text,
+    t_ref_set_vlan_comments                text,
+    t_ref_set_vlan_vlan_id                 integer,
+    t_ref_set_vlan_physical_zone           text,
+    t_ref_set_vlan_environnement           text,
+    t_ref_set_vlan_trunked                 boolean,
+    t_ref_set_vlan_natif                   boolean,
+    t_ref_set_vlan_lacp                    boolean,
+    t_ref_set_vlan_scope_info_blox         text,
+    t_ref_set_vlan_t_ap_code_authorized_id integer,
+    t_ref_set_vlan_scope_info_blox_mkp     text
+);
+
+CREATE TABLE IF NOT EXISTS supchain.t_catalog_server (
+    t_catalog_server_id                 serial PRIMARY KEY,
+    t_catalog_server_model              text,
+    t_catalog_server_vendor             text,
+    t_catalog_server_reftech_id         text,
+    t_catalog_server_refprod_id         text,
+    t_catalog_server_comments           text,
+    t_catalog_server_datetime_added     timestamp DEFAULT now(),
+    t_catalog_server_qualified          boolean,
+    t_catalog_server_qualif_in_progress boolean,
+    t_catalog_server_availability       text
+);
+
+-- ---------- warehouse (/servers/warehouse)
+CREATE TABLE IF NOT EXISTS supchain.t_server_sts (
+    t_server_sts_id                           serial PRIMARY KEY,
+    t_server_sts_po_number                    text,
+    t_server_sts_vendor                       text,
+    t_server_sts_model                        text,
+    t_server_sts_cfi_code                     text,
+    t_server_sts_serial                       text,
+    t_server_sts_country                      text,
+    t_server_sts_nic_count                    integer,
+    t_server_sts_t_ap_code_authorized_ap_code text,
+    t_server_sts_physical_zone_target         text,
+    t_server_sts_power_watt                   integer,
+    t_server_sts_heartbeat                    boolean,
+    t_server_sts_soki                         text,
+    t_server_sts_san                          boolean,
+    t_server_sts_state_string                 text
+);
+
+CREATE TABLE IF NOT EXISTS supchain.t_physical_zone (
+    t_physical_zone_id                serial PRIMARY KEY,
+    t_physical_zone_target            text,
+    t_physical_zone_date_availability text
+);
+
+-- ---------- validation (/servers/validate)
+CREATE TABLE IF NOT EXISTS public.t_serversts (
+    id               serial PRIMARY KEY,
+    hostname         text,
+    site_source      text,
+    site_target      text,
+    planned_date     date,
+    migration_status text
+);
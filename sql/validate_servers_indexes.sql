@@ -0,0 +1,7 @@
+-- /servers/validate: COUNT + page query only ever look at PendingValidation rows,
+-- ordered by planned_date DESC. A partial index keeps it small (decided rows drop out).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_serversts_pending_planned
+    ON T_ServerSts (planned_date DESC, id)
+    WHERE migration_status = 'PendingValidation';
+
+ANALYZE T_ServerSts;
@@ -0,0 +1,25 @@
+-- Warehouse selection (/servers/warehouse) stored per server with PATCH
+-- semantics instead of one servers_selection.json rewritten on every submit.
+--
+--   t_warehouse_selection      current value of each selected server
+--   t_warehouse_selection_log  append-only change log; consumers poll
+--                              GET /servers/warehouse/selection/changes?since=<seq>
+--
+-- Writers take a transaction advisory lock, so seq values become visible in
+-- increasing order and "since" never skips a change committed late.
+CREATE TABLE IF NOT EXISTS supchain.t_warehouse_selection (
+    server_id           integer PRIMARY KEY,
+    ap_code_authorized  text,
+    physical_zone       text,
+    power_watt          integer,
+    seq                 bigint NOT NULL,             -- last log entry applied
+    updated_at          timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS supchain.t_warehouse_selection_log (
+    seq         bigserial PRIMARY KEY,
+    server_id   integer NOT NULL,
+    op          text NOT NULL CHECK (op IN ('upsert', 'remove')),
+    fields      jsonb,                               -- changed fields only (upsert)
+    changed_at  timestamptz NOT NULL DEFAULT now()
+);